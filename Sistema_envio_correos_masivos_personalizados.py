@@ -12,13 +12,54 @@ como pausas anti-spam y variables dinámicas.
 import pandas as pd
 import smtplib
 import os
-from email.message import EmailMessage
+import re
+import sys
+import csv
+import difflib
+import gc
+import shutil
+import mailbox
+import itertools
+import json
+import heapq
+import socket
+import sqlite3
+import base64
+import hashlib
+import uuid
+import argparse
+import array
+import tempfile
+import tracemalloc
+from email.message import EmailMessage, MIMEPart
+from email.policy import SMTP as POLITICA_SMTP
 import time
 import random
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 import threading
-from datetime import datetime
+from collections import Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, time as dt_time
+
+try:
+    import resource  # Solo disponible en sistemas Unix
+except ImportError:
+    resource = None
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # Python 3.9+ (en Windows requiere tzdata)
+except ImportError:
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+try:
+    from cryptography.exceptions import InvalidSignature  # Solo necesario para la firma DKIM
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+except ImportError:
+    serialization = None
 
 
 # =============================================================================
@@ -29,12 +70,19 @@ class ConfiguradorPausas:
     Gestiona la configuración de pausas con modos normal y pruebas.
     """
     
-    def __init__(self):
-        """Inicializa el configurador con modos de pausa."""
+    def __init__(self, aleatorio=None):
+        """
+        Inicializa el configurador con modos de pausa.
+        
+        Args:
+            aleatorio (random.Random): Generador para las pausas (por defecto, el global);
+                el simulador usa uno con semilla para resultados reproducibles
+        """
         self.modo_pruebas = False
         self.min_segundos = 60
         self.max_segundos = 180
         self.pausa_pruebas = 2  # Solo 2 segundos en modo pruebas
+        self.aleatorio = aleatorio or random
     
     def set_modo_pruebas(self, activar):
         """
@@ -55,7 +103,412 @@ class ConfiguradorPausas:
         if self.modo_pruebas:
             return self.pausa_pruebas
         else:
-            return random.randint(self.min_segundos, self.max_segundos)
+            return self.aleatorio.randint(self.min_segundos, self.max_segundos)
+    
+    def obtener_espera_media(self):
+        """
+        Retorna el tiempo de espera medio según el modo actual (para estimaciones).
+        
+        Returns:
+            float: Tiempo medio de espera en segundos
+        """
+        if self.modo_pruebas:
+            return self.pausa_pruebas
+        return (self.min_segundos + self.max_segundos) / 2
+
+
+# =============================================================================
+# CLASE: SerializadorMIME
+# =============================================================================
+class SerializadorMIME:
+    """
+    Serializa mensajes MIME por bloques para escribirlos directamente al socket.
+    
+    El adjunto se codifica en base64 una sola vez y se reutiliza en todos los
+    mensajes mediante memoryview, de modo que cada envío solo reserva memoria
+    para cabeceras, cuerpo de texto y el bloque en curso.
+    """
+    
+    TAMANO_BLOQUE = 64 * 1024
+    BYTES_POR_LINEA_BASE64 = 57  # 57 bytes originales = 76 caracteres base64
+    
+    def __init__(self, archivo_adjunto="", tamano_bloque=TAMANO_BLOQUE):
+        """
+        Inicializa el serializador con el archivo adjunto opcional.
+        """
+        self.archivo_adjunto = archivo_adjunto
+        self.tamano_bloque = tamano_bloque
+        self._adjunto_codificado = None
+        self._cabecera_adjunto = None
+    
+    def _preparar_adjunto(self):
+        """
+        Codifica el adjunto en base64 con líneas CRLF y lo guarda en caché.
+        
+        La lectura y codificación se hacen por tramos para no tener a la vez
+        el archivo original y su versión codificada completos en memoria.
+        """
+        if self._adjunto_codificado is not None:
+            return
+        
+        codificado = bytearray()
+        tramo = self.BYTES_POR_LINEA_BASE64 * 1024
+        with open(self.archivo_adjunto, "rb") as f:
+            while True:
+                datos = f.read(tramo)
+                if not datos:
+                    break
+                # Líneas de 76 caracteres terminadas en CRLF (RFC 2045)
+                codificado += base64.encodebytes(datos).replace(b"\n", b"\r\n")
+        self._adjunto_codificado = codificado
+        
+        parte = MIMEPart(policy=POLITICA_SMTP)
+        parte.add_header("Content-Type", "application/octet-stream")
+        parte.add_header("Content-Transfer-Encoding", "base64")
+        parte.add_header("Content-Disposition", "attachment",
+                         filename=os.path.basename(self.archivo_adjunto))
+        self._cabecera_adjunto = self._serializar_cabeceras(parte) + b"\r\n"
+    
+    def adjunto_codificado(self):
+        """Retorna el adjunto codificado en base64 (lo prepara la primera vez)."""
+        self._preparar_adjunto()
+        return self._adjunto_codificado
+    
+    @staticmethod
+    def _serializar_cabeceras(parte):
+        """Serializa solo las líneas de cabecera de una parte MIME."""
+        return b"".join(POLITICA_SMTP.fold_binary(nombre, valor) for nombre, valor in parte.items())
+    
+    @staticmethod
+    def _escapar_puntos(datos):
+        """Duplica los puntos al inicio de línea según el protocolo SMTP (RFC 5321)."""
+        return re.sub(rb"(?m)^\.", b"..", datos)
+    
+    def componer(self, remitente, destinatario, asunto, cuerpo, adjuntar=False):
+        """
+        Construye las cabeceras y las partes del cuerpo del mensaje sin serializarlo.
+        
+        Returns:
+            tuple: (cabeceras, partes) con las líneas de cabecera en bytes y las partes
+                del cuerpo en orden; None marca la posición del adjunto compartido
+        """
+        cabecera = EmailMessage(policy=POLITICA_SMTP)
+        cabecera["From"] = remitente
+        cabecera["To"] = destinatario
+        cabecera["Subject"] = asunto
+        cabecera["MIME-Version"] = "1.0"
+        
+        texto = MIMEPart(policy=POLITICA_SMTP)
+        texto.set_content(cuerpo)
+        
+        if not adjuntar:
+            # Mensaje simple: las cabeceras de la parte de texto pasan al mensaje
+            cabeceras_texto, cuerpo_texto = texto.as_bytes().split(b"\r\n\r\n", 1)
+            return self._serializar_cabeceras(cabecera) + cabeceras_texto + b"\r\n", [cuerpo_texto]
+        
+        self._preparar_adjunto()
+        frontera = f"==============={uuid.uuid4().hex}=="
+        cabecera.add_header("Content-Type", "multipart/mixed", boundary=frontera)
+        delimitador = f"--{frontera}\r\n".encode("ascii")
+        
+        partes = [
+            delimitador + texto.as_bytes() + b"\r\n" + delimitador + self._cabecera_adjunto,
+            None,
+            f"--{frontera}--\r\n".encode("ascii"),
+        ]
+        return self._serializar_cabeceras(cabecera), partes
+    
+    def serializar(self, cabeceras, partes, para_smtp=True, firma=None):
+        """
+        Genera un mensaje compuesto como una secuencia de bloques de bytes.
+        
+        Args:
+            para_smtp (bool): Si es True se escapan los puntos para el comando DATA;
+                con False se obtiene el mensaje tal cual (por ejemplo, para un .eml)
+            firma (bytes o Future): Cabecera DKIM-Signature a anteponer; si es un Future
+                su resultado se espera al generar el primer bloque
+        
+        Returns:
+            generator: Bloques (bytes o memoryview) del mensaje
+        """
+        escapar = self._escapar_puntos if para_smtp else bytes
+        if firma is not None and not isinstance(firma, bytes):
+            firma = firma.result()
+        
+        # Cabeceras y primera parte: pequeñas, se escapan y envían juntas
+        yield escapar((firma or b"") + cabeceras + b"\r\n" + partes[0])
+        for parte in partes[1:]:
+            if parte is None:
+                # Adjunto pre-codificado: base64 nunca inicia línea con punto
+                vista = memoryview(self._adjunto_codificado)
+                for inicio in range(0, len(vista), self.tamano_bloque):
+                    yield vista[inicio:inicio + self.tamano_bloque]
+            else:
+                yield escapar(parte)
+    
+    def generar_bloques(self, remitente, destinatario, asunto, cuerpo, adjuntar=False, para_smtp=True):
+        """
+        Genera el mensaje completo como una secuencia de bloques de bytes.
+        
+        Args:
+            para_smtp (bool): Si es True se escapan los puntos para el comando DATA;
+                con False se obtiene el mensaje tal cual (por ejemplo, para un .eml)
+        
+        Returns:
+            generator: Bloques (bytes o memoryview) del mensaje
+        """
+        cabeceras, partes = self.componer(remitente, destinatario, asunto, cuerpo, adjuntar)
+        return self.serializar(cabeceras, partes, para_smtp)
+
+
+# =============================================================================
+# CLASE: FirmadorDKIM
+# =============================================================================
+# Cachés de cada proceso: la clave privada se interpreta y el adjunto se
+# canoniza una sola vez por proceso, no en cada mensaje
+_CLAVES_DKIM = {}
+_ADJUNTOS_DKIM = {}
+
+
+def _cargar_clave_dkim(ruta_clave):
+    """Retorna la clave privada PEM interpretada, desde la caché del proceso."""
+    clave = _CLAVES_DKIM.get(ruta_clave)
+    if clave is None:
+        if serialization is None:
+            raise RuntimeError("La firma DKIM requiere el paquete 'cryptography' (pip install cryptography)")
+        with open(ruta_clave, "rb") as f:
+            clave = serialization.load_pem_private_key(f.read(), password=None)
+        _CLAVES_DKIM[ruta_clave] = clave
+    return clave
+
+
+def _adjunto_canonico_dkim(archivo_adjunto):
+    """Retorna el adjunto codificado y canonizado (relaxed), desde la caché del proceso."""
+    canonico = _ADJUNTOS_DKIM.get(archivo_adjunto)
+    if canonico is None:
+        codificado = SerializadorMIME(archivo_adjunto).adjunto_codificado()
+        canonico = FirmadorDKIM.canonizar_cuerpo(codificado)
+        _ADJUNTOS_DKIM[archivo_adjunto] = canonico
+    return canonico
+
+
+def _firmar_mensaje_dkim(configuracion, cabeceras, partes, archivo_adjunto=""):
+    """
+    Calcula la cabecera DKIM-Signature de un mensaje compuesto por SerializadorMIME.
+    
+    Se ejecuta en los procesos del pool de firma (o directamente en los de exportación).
+    
+    Args:
+        configuracion (dict): ruta_clave, dominio y selector
+        cabeceras (bytes): Líneas de cabecera del mensaje
+        partes (list): Partes del cuerpo; None es el adjunto archivo_adjunto
+    
+    Returns:
+        bytes: Cabecera DKIM-Signature completa terminada en CRLF
+    """
+    adjunto = _adjunto_canonico_dkim(archivo_adjunto) if archivo_adjunto else None
+    resumen_cuerpo = base64.b64encode(FirmadorDKIM.resumir_cuerpo(partes, adjunto)).decode("ascii")
+    
+    campos = {nombre.strip().lower().decode("ascii"): (nombre, valor)
+              for nombre, valor in FirmadorDKIM.separar_cabeceras(cabeceras)}
+    firmadas = [nombre for nombre in FirmadorDKIM.CABECERAS_FIRMADAS if nombre in campos]
+    etiquetas = (f"v=1; a=rsa-sha256; c=relaxed/relaxed; d={configuracion['dominio']}; "
+                 f"s={configuracion['selector']};\r\n\tt={int(time.time())}; h={':'.join(firmadas)};\r\n\t"
+                 f"bh={resumen_cuerpo};\r\n\tb=")
+    
+    # La propia cabecera DKIM-Signature se firma con b= vacío y sin CRLF final
+    datos = b"".join(FirmadorDKIM.canonizar_cabecera(*campos[nombre]) for nombre in firmadas)
+    datos += FirmadorDKIM.canonizar_cabecera(b"DKIM-Signature", etiquetas.encode("ascii"))[:-2]
+    
+    firma = _cargar_clave_dkim(configuracion["ruta_clave"]).sign(datos, padding.PKCS1v15(), hashes.SHA256())
+    firma = base64.b64encode(firma).decode("ascii")
+    plegada = "\r\n\t ".join(firma[i:i + 72] for i in range(0, len(firma), 72))
+    return f"DKIM-Signature: {etiquetas}{plegada}\r\n".encode("ascii")
+
+
+class FirmadorDKIM:
+    """
+    Firma mensajes con DKIM (rsa-sha256, canonización relaxed/relaxed).
+    
+    El resumen del cuerpo y la firma RSA se calculan en un pool de procesos,
+    en paralelo con la conexión y el sobre SMTP, para no frenar el envío.
+    """
+    
+    CABECERAS_FIRMADAS = ("from", "to", "subject", "date", "message-id", "mime-version",
+                          "content-type", "content-transfer-encoding")
+    PROCESOS = 2
+    
+    def __init__(self, ruta_clave, dominio, selector, procesos=PROCESOS):
+        """
+        Inicializa el firmador y valida la clave privada.
+        
+        Args:
+            ruta_clave (str): Clave privada RSA en formato PEM
+            dominio (str): Dominio firmante (etiqueta d=)
+            selector (str): Selector del registro DNS (etiqueta s=)
+            procesos (int): Procesos del pool de firma
+        """
+        self.configuracion = {"ruta_clave": ruta_clave, "dominio": dominio, "selector": selector}
+        self.procesos = procesos
+        self._ejecutor = None
+        _cargar_clave_dkim(ruta_clave)
+    
+    @staticmethod
+    def crear_configuracion(ruta_clave, selector, dominio="", remitente=""):
+        """
+        Valida y retorna la configuración DKIM (dominio por defecto, el del remitente).
+        
+        Returns:
+            dict: ruta_clave, dominio y selector, listo para FirmadorDKIM(**configuracion)
+        """
+        dominio = dominio.strip() or remitente.rpartition("@")[2].strip()
+        if not os.path.isfile(ruta_clave):
+            raise ValueError(f"No se encontró la clave privada DKIM: {ruta_clave}")
+        if not selector.strip():
+            raise ValueError("Falta el selector DKIM")
+        if not dominio:
+            raise ValueError("Falta el dominio DKIM (o un remitente del que deducirlo)")
+        return {"ruta_clave": os.path.abspath(ruta_clave), "dominio": dominio, "selector": selector.strip()}
+    
+    def firmar(self, cabeceras, partes, archivo_adjunto=""):
+        """
+        Encarga la firma de un mensaje al pool de procesos.
+        
+        Returns:
+            Future: Resultado con la cabecera DKIM-Signature en bytes
+        """
+        if self._ejecutor is None:
+            self._ejecutor = ProcessPoolExecutor(max_workers=self.procesos)
+        return self._ejecutor.submit(_firmar_mensaje_dkim, self.configuracion, cabeceras, partes, archivo_adjunto)
+    
+    def cerrar(self):
+        """Cierra el pool de procesos de firma."""
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
+    
+    @staticmethod
+    def separar_cabeceras(cabeceras):
+        """Divide un bloque de cabeceras en pares (nombre, valor) sin desplegar."""
+        campos = re.split(rb"\r\n(?![ \t])", cabeceras.rstrip(b"\r\n"))
+        return [tuple(campo.split(b":", 1)) for campo in campos if b":" in campo]
+    
+    @staticmethod
+    def canonizar_cabecera(nombre, valor):
+        """Canonización relaxed de una cabecera (RFC 6376, 3.4.2)."""
+        valor = re.sub(rb"[ \t]+", b" ", re.sub(rb"\r\n(?=[ \t])", b"", valor)).strip(b" ")
+        return nombre.strip().lower() + b":" + valor + b"\r\n"
+    
+    @staticmethod
+    def canonizar_cuerpo(datos):
+        """
+        Canonización relaxed de líneas del cuerpo (RFC 6376, 3.4.4).
+        
+        No elimina las líneas vacías finales: eso depende del cuerpo completo
+        y lo resuelve resumir_cuerpo.
+        """
+        return re.sub(rb"[ \t]+\r\n", b"\r\n", re.sub(rb"[ \t]+", b" ", datos))
+    
+    @classmethod
+    def resumir_cuerpo(cls, partes, adjunto_canonico=None):
+        """
+        Calcula el SHA-256 del cuerpo canonizado a partir de sus partes.
+        
+        Cada parte termina en fin de línea; las líneas vacías del final de una
+        parte se aplazan hasta saber si las sigue contenido.
+        
+        Args:
+            adjunto_canonico (bytes): Adjunto ya canonizado que sustituye a las partes None
+        """
+        resumen = hashlib.sha256()
+        vacias = 0
+        for parte in partes:
+            canonico = adjunto_canonico if parte is None else cls.canonizar_cuerpo(parte)
+            fin = len(canonico)
+            while canonico.endswith(b"\r\n", 0, fin):
+                fin -= 2
+            if fin == 0:
+                vacias += len(canonico) // 2
+                continue
+            resumen.update(b"\r\n" * vacias)
+            resumen.update(memoryview(canonico)[:fin])
+            resumen.update(b"\r\n")
+            vacias = max(0, (len(canonico) - fin) // 2 - 1)
+        return resumen.digest()
+    
+    @classmethod
+    def verificar(cls, mensaje, clave_publica):
+        """
+        Verifica la firma DKIM de un mensaje contra una clave pública local (sin DNS).
+        
+        Args:
+            mensaje (bytes): Mensaje completo (por ejemplo, un .eml exportado)
+            clave_publica (bytes): Clave pública RSA en formato PEM
+        
+        Returns:
+            tuple: (bool, mensaje) con el resultado de la verificación
+        """
+        if serialization is None:
+            raise RuntimeError("La verificación DKIM requiere el paquete 'cryptography' (pip install cryptography)")
+        if b"\r\n" not in mensaje:
+            mensaje = mensaje.replace(b"\n", b"\r\n")
+        cabeceras, _, cuerpo = mensaje.partition(b"\r\n\r\n")
+        campos = cls.separar_cabeceras(cabeceras)
+        
+        firma = next((valor for nombre, valor in campos if nombre.strip().lower() == b"dkim-signature"), None)
+        if firma is None:
+            return False, "El mensaje no tiene cabecera DKIM-Signature"
+        etiquetas = {}
+        for etiqueta in re.sub(rb"\s+", b"", firma).decode("ascii").split(";"):
+            clave, _, valor = etiqueta.partition("=")
+            if clave:
+                etiquetas[clave] = valor
+        if etiquetas.get("a") != "rsa-sha256" or etiquetas.get("c") != "relaxed/relaxed":
+            return False, "Solo se verifican firmas rsa-sha256 con canonización relaxed/relaxed"
+        
+        if base64.b64decode(etiquetas["bh"]) != cls.resumir_cuerpo([cuerpo]):
+            return False, "El resumen del cuerpo (bh=) no coincide"
+        
+        # Cabeceras de h= en orden, tomando cada repetición desde abajo
+        disponibles = {}
+        for nombre, valor in campos:
+            disponibles.setdefault(nombre.strip().lower(), []).append((nombre, valor))
+        datos = b""
+        for nombre in etiquetas["h"].lower().split(":"):
+            instancias = disponibles.get(nombre.encode("ascii"))
+            if instancias:
+                datos += cls.canonizar_cabecera(*instancias.pop())
+        sin_firma = re.sub(rb"((?:^|;)\s*b\s*=)[^;]*", rb"\1", firma)
+        datos += cls.canonizar_cabecera(b"DKIM-Signature", sin_firma)[:-2]
+        
+        clave = serialization.load_pem_public_key(clave_publica)
+        try:
+            clave.verify(base64.b64decode(etiquetas["b"]), datos, padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            return False, "La firma (b=) no es válida para esta clave pública"
+        return True, f"Firma DKIM válida (d={etiquetas.get('d')}, s={etiquetas.get('s')})"
+    
+    @staticmethod
+    def generar_claves(prefijo, selector="prueba", bits=2048):
+        """
+        Genera un par de claves RSA de prueba: prefijo.key (privada) y prefijo.pub.
+        
+        Returns:
+            str: Registro TXT a publicar en selector._domainkey.<dominio>
+        """
+        if serialization is None:
+            raise RuntimeError("Generar claves DKIM requiere el paquete 'cryptography' (pip install cryptography)")
+        clave = rsa.generate_private_key(public_exponent=65537, key_size=bits)
+        with open(f"{prefijo}.key", "wb") as f:
+            f.write(clave.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                        serialization.NoEncryption()))
+        publica = clave.public_key().public_bytes(serialization.Encoding.PEM,
+                                                  serialization.PublicFormat.SubjectPublicKeyInfo)
+        with open(f"{prefijo}.pub", "wb") as f:
+            f.write(publica)
+        
+        der = b"".join(publica.splitlines()[1:-1]).decode("ascii")
+        return f'{selector}._domainkey IN TXT "v=DKIM1; k=rsa; p={der}"'
 
 
 # =============================================================================
@@ -66,43 +519,61 @@ class ManejadorCorreo:
     Gestiona el envío de correos electrónicos a través del servidor SMTP de GMX.
     """
     
-    def __init__(self, remitente, clave, archivo_adjunto="", adjuntar_archivo=False):
+    SERVIDOR_SMTP = "mail.gmx.com"
+    PUERTO_SMTP = 465
+    
+    def __init__(self, remitente, clave, archivo_adjunto="", adjuntar_archivo=False, firmador=None):
         """
         Inicializa el manejador de correo con las credenciales y configuración.
+        
+        Args:
+            firmador (FirmadorDKIM): Firma DKIM de los mensajes (None = sin firma)
         """
         self.remitente = remitente
         self.clave = clave
         self.archivo_adjunto = archivo_adjunto
         self.adjuntar_archivo = adjuntar_archivo
+        self.serializador = SerializadorMIME(archivo_adjunto)
+        self.firmador = firmador
+
+    def debe_adjuntar(self):
+        """Indica si el adjunto está configurado y el archivo existe."""
+        return bool(self.adjuntar_archivo and self.archivo_adjunto and os.path.isfile(self.archivo_adjunto))
+
+    def preparar_mensaje(self, destinatario, asunto, cuerpo):
+        """
+        Compone el mensaje y, si hay firmador, encarga su firma DKIM al pool.
+        
+        La firma se calcula mientras se abre la conexión y se negocia el sobre
+        SMTP; los bloques solo la esperan al escribir el primero.
+        
+        Returns:
+            generator: Bloques del mensaje para enviar_por_bloques
+        """
+        adjuntar = self.debe_adjuntar()
+        cabeceras, partes = self.serializador.componer(self.remitente, destinatario, asunto, cuerpo, adjuntar)
+        firma = None
+        if self.firmador is not None:
+            firma = self.firmador.firmar(cabeceras, partes, self.archivo_adjunto if adjuntar else "")
+        return self.serializador.serializar(cabeceras, partes, firma=firma)
+
+    def cerrar(self):
+        """Libera el pool de firma DKIM, si lo hay."""
+        if self.firmador is not None:
+            self.firmador.cerrar()
 
     def enviar_correo(self, destinatario, asunto, cuerpo, variables, interfaz):
         """
         Envía un correo electrónico individual a través del servidor SMTP de GMX.
         """
         try:
-            # Crear objeto de mensaje de email
-            mensaje = EmailMessage()
-            mensaje["From"] = self.remitente
-            mensaje["To"] = destinatario
-            mensaje["Subject"] = asunto
-            mensaje.set_content(cuerpo)
-
-            # Adjuntar archivo si está configurado y el archivo existe
-            if self.adjuntar_archivo and self.archivo_adjunto and os.path.isfile(self.archivo_adjunto):
-                with open(self.archivo_adjunto, "rb") as f:
-                    data = f.read()
-                    nombre = os.path.basename(self.archivo_adjunto)
-                    mensaje.add_attachment(
-                        data,
-                        maintype="application",
-                        subtype="octet-stream",
-                        filename=nombre
-                    )
+            # Generar el mensaje por bloques (el adjunto se codifica una sola vez)
+            bloques = self.preparar_mensaje(destinatario, asunto, cuerpo)
 
             # Envío a través de GMX
-            with smtplib.SMTP_SSL("mail.gmx.com", 465) as smtp:
+            with smtplib.SMTP_SSL(self.SERVIDOR_SMTP, self.PUERTO_SMTP) as smtp:
                 smtp.login(self.remitente, self.clave)
-                smtp.send_message(mensaje)
+                self.enviar_por_bloques(smtp, destinatario, bloques)
                 
                 # Mostrar información del envío
                 empresa = variables.get('empresa', 'N/A')
@@ -112,6 +583,105 @@ class ManejadorCorreo:
         except Exception as e:
             interfaz.log(f"❌ Error al enviar correo a {destinatario}: {e}")
 
+    def enviar_por_bloques(self, smtp, destinatario, bloques):
+        """
+        Ejecuta la transacción SMTP escribiendo el mensaje al socket bloque a bloque.
+        
+        Equivale a smtp.send_message() pero sin aplanar el mensaje completo en memoria.
+        """
+        smtp.ehlo_or_helo_if_needed()
+        
+        codigo, respuesta = smtp.mail(self.remitente)
+        if codigo != 250:
+            smtp.rset()
+            raise smtplib.SMTPSenderRefused(codigo, respuesta, self.remitente)
+        
+        codigo, respuesta = smtp.rcpt(destinatario)
+        if codigo not in (250, 251):
+            smtp.rset()
+            raise smtplib.SMTPRecipientsRefused({destinatario: (codigo, respuesta)})
+        
+        smtp.putcmd("data")
+        codigo, respuesta = smtp.getreply()
+        if codigo != 354:
+            smtp.rset()
+            raise smtplib.SMTPDataError(codigo, respuesta)
+        
+        for bloque in bloques:
+            smtp.sock.sendall(bloque)
+        
+        # Todos los mensajes terminan en CRLF, solo falta el punto final
+        smtp.sock.sendall(b".\r\n")
+        codigo, respuesta = smtp.getreply()
+        if codigo != 250:
+            smtp.rset()
+            raise smtplib.SMTPDataError(codigo, respuesta)
+
+
+# =============================================================================
+# CLASE: PoolConexionesSMTP
+# =============================================================================
+class PoolConexionesSMTP:
+    """
+    Mantiene abierta una conexión SMTP autenticada por remitente para
+    reutilizarla entre envíos de distintas campañas.
+    """
+    
+    def __init__(self, servidor=ManejadorCorreo.SERVIDOR_SMTP, puerto=ManejadorCorreo.PUERTO_SMTP):
+        """
+        Inicializa el pool sin conexiones abiertas.
+        """
+        self.servidor = servidor
+        self.puerto = puerto
+        self._conexiones = {}
+        self._lock = threading.Lock()
+    
+    def obtener(self, remitente, clave):
+        """
+        Retorna una conexión viva para el remitente, creándola si hace falta.
+        """
+        with self._lock:
+            smtp = self._conexiones.get(remitente)
+            if smtp is not None:
+                try:
+                    # El servidor puede cerrar conexiones inactivas durante las pausas
+                    if smtp.noop()[0] == 250:
+                        return smtp
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._cerrar(smtp)
+            
+            smtp = smtplib.SMTP_SSL(self.servidor, self.puerto)
+            try:
+                smtp.login(remitente, clave)
+            except Exception:
+                self._cerrar(smtp)
+                raise
+            self._conexiones[remitente] = smtp
+            return smtp
+    
+    def descartar(self, remitente):
+        """Cierra y olvida la conexión de un remitente (por ejemplo, tras un error)."""
+        with self._lock:
+            smtp = self._conexiones.pop(remitente, None)
+            if smtp is not None:
+                self._cerrar(smtp)
+    
+    def cerrar_todas(self):
+        """Cierra todas las conexiones abiertas."""
+        with self._lock:
+            for smtp in self._conexiones.values():
+                self._cerrar(smtp)
+            self._conexiones.clear()
+    
+    @staticmethod
+    def _cerrar(smtp):
+        """Cierra una conexión ignorando errores de red."""
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
 
 # =============================================================================
 # CLASE: PersonalizadorMensaje
@@ -121,25 +691,83 @@ class PersonalizadorMensaje:
     Gestiona la personalización dinámica de asuntos y cuerpos de correo.
     """
     
+    # {variable}: sin espacio inicial ni ':' o ';', para que el CSS ({ color: red; }) se envíe tal cual
+    PATRON_VARIABLE = re.compile(r"\{([^{}\s:;][^{}:;\n]*)\}")
+    # Cualquier texto entre llaves, sea o no una variable
+    PATRON_LLAVES = re.compile(r"\{[^{}]*\}")
+    
     def __init__(self):
         """Inicializa el personalizador con formatos vacíos."""
         self.formato_asunto = ""
         self.formato_cuerpo = ""
+        self._plantillas = {}
     
-    def generar_mensaje(self, **variables):
+    def _compilar(self, formato):
         """
-        Genera el asunto y cuerpo del mensaje aplicando las variables.
+        Divide una plantilla en texto fijo y nombres de variable (una vez por plantilla).
+        
+        Returns:
+            list: Texto literal en las posiciones pares y nombres de variable en las impares
+        """
+        partes = self._plantillas.get(formato)
+        if partes is None:
+            partes = self._plantillas[formato] = self.PATRON_VARIABLE.split(formato)
+        return partes
+    
+    @classmethod
+    def extraer_variables(cls, plantilla):
+        """
+        Retorna las {variables} de una plantilla, sin repetir y en orden de aparición.
+        """
+        return list(dict.fromkeys(cls.PATRON_VARIABLE.findall(plantilla)))
+    
+    @classmethod
+    def extraer_llaves_literales(cls, plantilla):
+        """
+        Retorna el texto entre llaves que no es una variable y se enviará sin sustituir.
         """
-        asunto = self.formato_asunto
-        cuerpo = self.formato_cuerpo
+        return list(dict.fromkeys(fragmento for fragmento in cls.PATRON_LLAVES.findall(plantilla)
+                                  if not cls.PATRON_VARIABLE.fullmatch(fragmento)))
+    
+    def _aplicar(self, formato, variables):
+        """
+        Sustituye las variables de la plantilla; las que la fila no tiene quedan como {nombre}.
+        """
+        partes = self._compilar(formato)
+        resultado = partes[:]
+        for posicion in range(1, len(partes), 2):
+            valor = variables.get(partes[posicion], SIN_VALOR)
+            if valor is SIN_VALOR:
+                resultado[posicion] = f"{{{partes[posicion]}}}"
+            else:
+                resultado[posicion] = str(valor)
+        return "".join(resultado)
+    
+    def variables_sin_coincidencia(self, variables, columnas_uniones):
+        """
+        Retorna las variables de las plantillas que aporta una unión sin coincidencia para la fila.
         
-        # Reemplazar cada variable en el asunto y cuerpo
-        for key, value in variables.items():
-            placeholder = f"{{{key}}}"
-            asunto = asunto.replace(placeholder, str(value))
-            cuerpo = cuerpo.replace(placeholder, str(value))
+        Enviar esa fila dejaría {variable} en el texto. Las demás variables
+        que la fila no tenga se dejan como texto, igual que al renderizar.
+        
+        Args:
+            variables (RegistroContacto o dict): Valores de la fila por nombre de columna
+            columnas_uniones (set): Columnas aportadas por las uniones configuradas
+        """
+        if not columnas_uniones:
+            return []
+        nombres = self._compilar(self.formato_asunto)[1::2] + self._compilar(self.formato_cuerpo)[1::2]
+        return [nombre for nombre in dict.fromkeys(nombres)
+                if nombre in columnas_uniones and nombre not in variables]
+    
+    def generar_mensaje(self, variables):
+        """
+        Genera el asunto y cuerpo del mensaje aplicando las variables.
         
-        return asunto, cuerpo
+        Args:
+            variables (RegistroContacto o dict): Valores de la fila por nombre de columna
+        """
+        return self._aplicar(self.formato_asunto, variables), self._aplicar(self.formato_cuerpo, variables)
 
 
 # =============================================================================
@@ -179,146 +807,2223 @@ class ManejadorPausas:
 
 
 # =============================================================================
-# CLASE: ProcesadorExcel
+# CLASE: VentanaEnvio
 # =============================================================================
-class ProcesadorExcel:
+class VentanaEnvio:
     """
-    Procesa archivos Excel y extrae información de contactos.
+    Franja horaria en la que se permite enviar (por ejemplo, L-V de 09:00 a 18:00).
+    
+    La franja se evalúa en la zona horaria de cada destinatario.
     """
     
-    def __init__(self, ruta_excel):
-        """
-        Inicializa el procesador con la ruta del archivo Excel.
+    DIAS = "LMXJVSD"  # Lunes a domingo, como datetime.weekday()
+    
+    def __init__(self, hora_inicio=dt_time(9, 0), hora_fin=dt_time(18, 0), dias=(0, 1, 2, 3, 4)):
         """
-        self.ruta_excel = ruta_excel
-        self.dataframe = None
-        self.columnas = []
+        Inicializa la ventana.
         
-    def cargar_datos(self):
-        """
-        Carga y valida los datos del archivo Excel.
+        Args:
+            hora_inicio (datetime.time): Hora local de apertura
+            hora_fin (datetime.time): Hora local de cierre (excluida)
+            dias (tuple): Días permitidos (0 = lunes ... 6 = domingo)
         """
-        try:
-            self.dataframe = pd.read_excel(self.ruta_excel)
-            self.columnas = self.dataframe.columns.tolist()
-            return True
-        except FileNotFoundError:
-            raise FileNotFoundError(f"No se encontró el archivo Excel: {self.ruta_excel}")
-        except Exception as e:
-            raise Exception(f"Error al cargar el Excel: {str(e)}")
+        if hora_inicio >= hora_fin:
+            raise ValueError("La hora de inicio de la ventana debe ser anterior a la hora de fin")
+        if not dias:
+            raise ValueError("La ventana de envío debe incluir al menos un día")
+        self.hora_inicio = hora_inicio
+        self.hora_fin = hora_fin
+        self.dias = frozenset(dias)
     
-    def obtener_correo_destino(self, fila):
+    @classmethod
+    def desde_texto(cls, texto):
         """
-        Busca y retorna el correo electrónico en una fila de datos.
+        Crea una ventana desde el formato "[días] HH:MM-HH:MM".
+        
+        Ejemplos: "09:00-18:00" (todos los días), "L-V 09:00-18:00", "L,X,V 10:00-14:00"
         """
-        columnas_posibles = ['email', 'correo', 'e-mail', 'mail', 'Email', 'Correo']
+        partes = texto.split()
+        if len(partes) not in (1, 2):
+            raise ValueError(f"Ventana de envío no válida: {texto}")
         
-        for columna in columnas_posibles:
-            if columna in fila and pd.notna(fila[columna]):
-                return fila[columna]
+        try:
+            inicio, fin = (datetime.strptime(h.strip(), "%H:%M").time() for h in partes[-1].split("-"))
+        except ValueError:
+            raise ValueError(f"Horario de ventana no válido (use HH:MM-HH:MM): {partes[-1]}")
         
-        return None
+        dias = range(7)
+        if len(partes) == 2:
+            dias = cls._interpretar_dias(partes[0].upper())
+        return cls(inicio, fin, dias)
     
-    def obtener_total_filas(self):
-        """
-        Retorna el número total de filas (contactos) en el Excel.
-        """
-        return len(self.dataframe) if self.dataframe is not None else 0
+    @classmethod
+    def _interpretar_dias(cls, texto):
+        """Convierte "L-V" o "L,X,V" en índices de día."""
+        letras = set(cls.DIAS)
+        dias = set()
+        for tramo in texto.split(","):
+            desde, _, hasta = tramo.partition("-")
+            hasta = hasta or desde
+            if desde not in letras or hasta not in letras:
+                raise ValueError(f"Días de ventana no válidos (use letras {cls.DIAS}): {texto}")
+            dias.update(range(cls.DIAS.index(desde), cls.DIAS.index(hasta) + 1))
+        return dias
     
-    def iterar_filas(self):
-        """
-        Generador para iterar sobre todas las filas del DataFrame.
+    def siguiente_instante(self, momento):
         """
-        if self.dataframe is None:
-            raise Exception("No hay datos cargados. Ejecute cargar_datos() primero.")
+        Retorna el primer instante >= momento que cae dentro de la ventana.
         
-        for index, row in self.dataframe.iterrows():
-            yield index, row
+        Args:
+            momento (datetime): Fecha y hora con zona horaria del destinatario
+        """
+        for desplazamiento in range(8):
+            dia = (momento + timedelta(days=desplazamiento)).date()
+            if dia.weekday() not in self.dias:
+                continue
+            apertura = datetime.combine(dia, self.hora_inicio, tzinfo=momento.tzinfo)
+            cierre = datetime.combine(dia, self.hora_fin, tzinfo=momento.tzinfo)
+            if momento < apertura:
+                return apertura
+            if momento < cierre:
+                return momento
+        # Inalcanzable con al menos un día permitido
+        return momento
+    
+    def __str__(self):
+        dias = "".join(letra for i, letra in enumerate(self.DIAS) if i in self.dias)
+        return f"{dias} {self.hora_inicio:%H:%M}-{self.hora_fin:%H:%M}"
 
 
 # =============================================================================
-# CLASE: ManejadorBaseDatos
+# CLASE: ProgramadorEnvios
 # =============================================================================
-class ManejadorBaseDatos:
+class ProgramadorEnvios:
     """
-    Coordina el proceso de envío masivo utilizando todos los componentes.
+    Ordena los contactos por su próximo instante de envío permitido y los
+    entrega cuando llega su turno.
+    
+    Los contactos se guardan en un heap por instante elegible; el programador
+    duerme hasta que el primero pueda enviarse, respetando la cancelación.
     """
     
-    def __init__(self, ruta_excel, correo_obj, personalizador, manejador_pausas):
+    COLUMNAS_ZONA = ['zona_horaria', 'timezone', 'tz', 'Zona_horaria', 'Timezone']
+    
+    def __init__(self, ventana, zona_predeterminada=""):
         """
-        Inicializa el manejador de base de datos con todos los componentes necesarios.
+        Inicializa el programador.
+        
+        Args:
+            ventana (VentanaEnvio): Franja permitida para toda la campaña
+            zona_predeterminada (str): Zona IANA (p. ej. "America/Mexico_City") para
+                contactos sin columna de zona; vacía = zona del sistema
         """
-        self.ruta_excel = ruta_excel
-        self.correo_obj = correo_obj
-        self.personalizador = personalizador
-        self.manejador_pausas = manejador_pausas
-        self.contador = 0
-        self.procesador_excel = ProcesadorExcel(ruta_excel)
+        self.ventana = ventana
+        self.zona_predeterminada = self._resolver_zona(zona_predeterminada) if zona_predeterminada else None
+        self._zonas = {}
     
-    def enviar_todos(self, interfaz):
+    @staticmethod
+    def _resolver_zona(nombre):
+        """Retorna el objeto de zona horaria para un nombre IANA."""
+        if ZoneInfo is None:
+            raise ValueError("Las zonas horarias requieren Python 3.9+ (y 'pip install tzdata' en Windows)")
+        try:
+            return ZoneInfo(nombre)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Zona horaria desconocida: {nombre}")
+    
+    def zona_de(self, variables):
         """
-        Ejecuta el proceso completo de envío masivo de correos.
+        Retorna la zona horaria del contacto (columna de zona o predeterminada).
         """
-        try:
-            # Cargar datos del Excel
-            self.procesador_excel.cargar_datos()
-            total_correos = self.procesador_excel.obtener_total_filas()
-            interfaz.total_correos = total_correos
-            
-            interfaz.log(f"📤 INICIANDO ENVÍO DE {total_correos} CORREOS")
+        for columna in self.COLUMNAS_ZONA:
+            nombre = variables.get(columna)
+            if isinstance(nombre, str) and nombre.strip():
+                nombre = nombre.strip()
+                if nombre not in self._zonas:
+                    try:
+                        self._zonas[nombre] = self._resolver_zona(nombre)
+                    except ValueError:
+                        self._zonas[nombre] = None
+                if self._zonas[nombre] is not None:
+                    return self._zonas[nombre]
+                break
+        return self.zona_predeterminada
+    
+    def instante_elegible(self, zona, instante):
+        """
+        Retorna (timestamp) el primer instante >= instante permitido en la zona indicada.
+        """
+        momento = datetime.fromtimestamp(instante, tz=zona) if zona else datetime.fromtimestamp(instante).astimezone()
+        return self.ventana.siguiente_instante(momento).timestamp()
+    
+    @staticmethod
+    def _clave_zona(zona):
+        """Clave comparable para desempatar zonas en el heap."""
+        return str(zona) if zona else ""
+    
+    def construir_heap(self, contactos, ahora):
+        """
+        Agrupa los contactos por zona horaria y crea el heap de zonas.
+        
+        Todos los contactos de una zona abren y cierran ventana a la vez, así que
+        el heap guarda un elemento por zona (instante elegible, orden, zona) y
+        cada zona conserva sus contactos en orden en una cola FIFO.
+        
+        Returns:
+            tuple: (heap, grupos) con grupos = {zona: deque[(índice, variables)]}
+        """
+        grupos = {}
+        primer_orden = {}
+        for orden, (index, variables) in enumerate(contactos):
+            zona = self.zona_de(variables)
+            if zona not in grupos:
+                grupos[zona] = deque()
+                primer_orden[zona] = orden
+            grupos[zona].append((index, variables))
+        
+        heap = [(self.instante_elegible(zona, ahora), primer_orden[zona], self._clave_zona(zona), zona)
+                for zona in grupos]
+        heapq.heapify(heap)
+        return heap, grupos
+    
+    def tomar_zona(self, heap, reloj):
+        """
+        Saca del heap la zona que puede enviar en el instante reloj.
+        
+        Returns:
+            tuple: (zona, None) si hay una zona lista (zona None = hora local), o
+                (None, instante) con el próximo instante en que alguna podría estarlo
+        """
+        instante, orden, clave, zona = heap[0]
+        if instante > reloj:
+            return None, instante
+        
+        # La ventana de la zona pudo cerrarse desde que se programó
+        elegible = self.instante_elegible(zona, reloj)
+        if elegible > reloj + 1:
+            heapq.heapreplace(heap, (elegible, orden, clave, zona))
+            return None, heap[0][0]
+        
+        heapq.heappop(heap)
+        return zona, None
+    
+    def reprogramar_zona(self, heap, zona, instante):
+        """Devuelve una zona al heap a partir de instante, detrás de las que ya esperaban."""
+        heapq.heappush(heap, (instante, 0, self._clave_zona(zona), zona))
+    
+    def proyectar_finalizacion(self, heap, grupos, ahora, segundos_por_envio):
+        """
+        Estima cuándo terminará la campaña repitiendo el orden de envío sin enviar.
+        
+        Args:
+            segundos_por_envio (float): Tiempo medio por correo (pausa incluida)
+        
+        Returns:
+            float: Timestamp estimado del último envío
+        """
+        simulacion = list(heap)
+        restantes = {zona: len(cola) for zona, cola in grupos.items()}
+        reloj = ahora
+        while simulacion:
+            zona, instante = self.tomar_zona(simulacion, reloj)
+            if instante is not None:
+                reloj = max(reloj, instante)
+                continue
+            
+            restantes[zona] -= 1
+            reloj += segundos_por_envio
+            if restantes[zona]:
+                self.reprogramar_zona(simulacion, zona, reloj)
+        return reloj
+    
+    def programar(self, contactos, interfaz, segundos_por_envio):
+        """
+        Generador que entrega (índice, variables) en el orden y momento permitidos.
+        
+        Antes de empezar informa en el log la fecha estimada de finalización.
+        """
+        ahora = time.time()
+        heap, grupos = self.construir_heap(contactos, ahora)
+        fin_estimado = self.proyectar_finalizacion(heap, grupos, ahora, segundos_por_envio)
+        interfaz.log(f"🕒 Ventana de envío: {self.ventana} | Finalización estimada: "
+                     f"{datetime.fromtimestamp(fin_estimado):%Y-%m-%d %H:%M}")
+        desconocidas = sorted(nombre for nombre, zona in self._zonas.items() if zona is None)
+        if desconocidas:
+            interfaz.log(f"⚠️ Zonas horarias desconocidas (se usa la predeterminada): {', '.join(desconocidas)}")
+        
+        while heap and interfaz.enviando:
+            zona, instante = self.tomar_zona(heap, time.time())
+            if instante is not None:
+                self._esperar_hasta(instante, interfaz)
+                continue
+            
+            yield grupos[zona].popleft()
+            
+            # La zona vuelve al heap detrás de las que ya esperaban (turnos alternos)
+            if grupos[zona]:
+                self.reprogramar_zona(heap, zona, time.time())
+    
+    @staticmethod
+    def _esperar_hasta(instante, interfaz):
+        """Duerme hasta el instante indicado, comprobando la cancelación cada segundo."""
+        restante = int(instante - time.time())
+        if restante > 0:
+            interfaz.log(f"🌙 Fuera de ventana: próximo envío a las "
+                         f"{datetime.fromtimestamp(instante):%Y-%m-%d %H:%M}")
+        while interfaz.enviando:
+            restante = instante - time.time()
+            if restante <= 0:
+                break
+            time.sleep(min(restante, 1))
+            interfaz.actualizar_estado_pausa(int(restante))
+        interfaz.actualizar_estado_pausa(0)
+
+
+# =============================================================================
+# CLASE: EsquemaContactos
+# =============================================================================
+class EsquemaContactos:
+    """
+    Nombres de columna de una campaña, compartidos por todas sus filas.
+    
+    Cada fila guarda solo sus valores; el esquema traduce el nombre de una
+    variable a su posición. Los nombres se guardan como texto, igual que
+    aparecen en las plantillas ({nombre}).
+    """
+    
+    __slots__ = ("columnas", "posiciones")
+    
+    def __init__(self, columnas):
+        """
+        Inicializa el esquema.
+        
+        Args:
+            columnas (list): Nombres de columna en el orden de los valores
+        """
+        self.columnas = tuple(str(columna) for columna in columnas)
+        self.posiciones = {columna: posicion for posicion, columna in enumerate(self.columnas)}
+
+
+# =============================================================================
+# CLASE: RegistroContacto
+# =============================================================================
+class _SinValor:
+    """Marca una variable ausente en una fila (p. ej. una unión sin coincidencia)."""
+    
+    __slots__ = ()
+    
+    def __repr__(self):
+        return "SIN_VALOR"
+    
+    def __reduce__(self):
+        # Conserva la identidad al pasar registros a otros procesos
+        return "SIN_VALOR"
+
+
+SIN_VALOR = _SinValor()
+
+
+class RegistroContacto(Mapping):
+    """
+    Fila de contactos compacta: una tupla de valores y el esquema compartido.
+    
+    Se usa como un diccionario de solo lectura (get, [], in, keys, items), de
+    modo que sustituye al dict por fila sin repetir los nombres de columna en
+    cada contacto.
+    """
+    
+    __slots__ = ("esquema", "valores")
+    
+    def __init__(self, esquema, valores):
+        """
+        Inicializa el registro.
+        
+        Args:
+            esquema (EsquemaContactos): Columnas compartidas
+            valores (tuple): Valores de la fila en el orden del esquema
+        """
+        self.esquema = esquema
+        self.valores = valores
+    
+    def get(self, columna, defecto=None):
+        """Retorna el valor de la columna, o defecto si la fila no lo tiene."""
+        posicion = self.esquema.posiciones.get(columna)
+        if posicion is None:
+            return defecto
+        valor = self.valores[posicion]
+        return defecto if valor is SIN_VALOR else valor
+    
+    def __getitem__(self, columna):
+        valor = self.get(columna, SIN_VALOR)
+        if valor is SIN_VALOR:
+            raise KeyError(columna)
+        return valor
+    
+    def __contains__(self, columna):
+        return self.get(columna, SIN_VALOR) is not SIN_VALOR
+    
+    def __iter__(self):
+        for columna, valor in zip(self.esquema.columnas, self.valores):
+            if valor is not SIN_VALOR:
+                yield columna
+    
+    def __len__(self):
+        return sum(1 for valor in self.valores if valor is not SIN_VALOR)
+    
+    def __repr__(self):
+        return f"RegistroContacto({dict(self)!r})"
+
+
+# =============================================================================
+# CLASE: TablaContactos
+# =============================================================================
+class TablaContactos:
+    """
+    Contactos almacenados por columnas: una secuencia de valores por columna.
+    
+    Los textos repetidos (empresa, ciudad, cargo...) se internan al cargar,
+    de modo que miles de filas comparten el mismo objeto en lugar de una
+    copia por fila. Las columnas de enteros y decimales se guardan en un
+    array.array (8 bytes por celda) y las filas se reconstruyen como tuplas
+    al iterar.
+    """
+    
+    # Tipos de columna de pandas que caben en un array.array sin perder valores
+    TIPOS_ARRAY = {"int64": "q", "float64": "d"}
+    
+    def __init__(self, esquema, datos):
+        """
+        Inicializa la tabla.
+        
+        Args:
+            esquema (EsquemaContactos): Columnas de la tabla
+            datos (list): Una secuencia de valores (list o array.array) por columna, en el orden del esquema
+        """
+        self.esquema = esquema
+        self.datos = datos
+    
+    @classmethod
+    def desde_dataframe(cls, dataframe):
+        """
+        Convierte un DataFrame en tabla, liberándolo columna a columna.
+        
+        Cada columna se extrae del DataFrame (pop) al convertirla, así que el
+        pico de memoria es de una columna y no de la hoja completa duplicada.
+        El DataFrame queda vacío: no debe usarse después.
+        
+        Solo se internan los textos: 1, 1.0 y True son iguales como claves de
+        un diccionario y se confundirían al renderizarlos. Un array.array
+        devuelve int y float de Python, igual que tolist().
+        """
+        esquema = EsquemaContactos(dataframe.columns)
+        internados = {}
+        nulo = float("nan")
+        datos = []
+        for columna in dataframe.columns.tolist():
+            serie = dataframe.pop(columna)
+            codigo = cls.TIPOS_ARRAY.get(str(serie.dtype))
+            if codigo:
+                numeros = array.array(codigo)
+                numeros.frombytes(serie.to_numpy().tobytes())
+                datos.append(numeros)
+                continue
+            valores = serie.tolist()
+            # Las celdas vacías comparten un único NaN en lugar de uno por celda
+            datos.append([internados.setdefault(valor, valor) if type(valor) is str
+                          else nulo if valor != valor and isinstance(valor, float) else valor
+                          for valor in valores])
+        return cls(esquema, datos)
+    
+    def __len__(self):
+        return len(self.datos[0]) if self.datos else 0
+    
+    def fila(self, posicion):
+        """Retorna (tuple) los valores de la fila en la posición indicada."""
+        return tuple(columna[posicion] for columna in self.datos)
+    
+    def filas(self, inicio=0, fin=None):
+        """
+        Generador de tuplas de valores entre las posiciones inicio y fin (excluida).
+        """
+        return zip(*(itertools.islice(columna, inicio, fin) for columna in self.datos))
+    
+    def registros(self, inicio=0, fin=None):
+        """
+        Generador de RegistroContacto entre las posiciones inicio y fin (excluida).
+        """
+        esquema = self.esquema
+        for valores in self.filas(inicio, fin):
+            yield RegistroContacto(esquema, valores)
+
+
+# =============================================================================
+# CLASE: UnionContactos
+# =============================================================================
+class UnionContactos:
+    """
+    Describe una fuente secundaria de variables (archivo y hoja) unida a los
+    contactos por una columna clave.
+    
+    El índice hash se construye una sola vez, de modo que cada fila obtiene
+    sus variables adicionales con una búsqueda O(1) durante la iteración.
+    """
+    
+    def __init__(self, ruta, clave_principal, clave_fuente=None, hoja=0, prefijo=""):
+        """
+        Inicializa la unión.
+        
+        Args:
+            ruta (str): Archivo Excel de la fuente secundaria
+            clave_principal (str): Columna de los contactos (o de una unión anterior) usada como clave
+            clave_fuente (str): Columna de la fuente secundaria; por defecto igual a clave_principal
+            hoja (str|int): Hoja a leer de la fuente secundaria
+            prefijo (str): Prefijo opcional para las variables aportadas por la fuente
+        """
+        self.ruta = ruta
+        self.clave_principal = clave_principal
+        self.clave_fuente = clave_fuente or clave_principal
+        self.hoja = hoja
+        self.prefijo = prefijo
+        self.indice = None
+        self.tabla = None
+        self.columnas = []
+        self.claves_duplicadas = 0
+        self.sin_coincidencia = 0
+    
+    @classmethod
+    def desde_texto(cls, especificacion):
+        """
+        Crea una unión desde el formato "ruta[#hoja]:clave_principal[=clave_fuente]".
+        
+        Ejemplo: "saldos.xlsx#Marzo:cliente_id=id"
+        """
+        ruta_hoja, separador, claves = especificacion.strip().rpartition(":")
+        if not separador or not ruta_hoja or not claves:
+            raise ValueError(f"Unión no válida (use ruta[#hoja]:clave[=clave_fuente]): {especificacion}")
+        
+        ruta, _, hoja = ruta_hoja.partition("#")
+        clave_principal, _, clave_fuente = claves.partition("=")
+        if hoja.isdigit():
+            hoja = int(hoja)
+        return cls(ruta.strip(), clave_principal.strip(), clave_fuente.strip() or None, hoja or 0)
+    
+    @staticmethod
+    def normalizar_clave(valor):
+        """
+        Normaliza una clave para que 1001, 1001.0 y " 1001 " coincidan entre hojas.
+        """
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        return str(valor).strip()
+    
+    def leer_encabezado(self):
+        """
+        Lee solo la fila de encabezado de la fuente secundaria.
+        
+        Returns:
+            list: Variables que aportará la unión (con prefijo, sin la columna clave)
+        """
+        try:
+            columnas = pd.read_excel(self.ruta, sheet_name=self.hoja, nrows=0).columns.tolist()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el archivo de unión: {self.ruta}")
+        except Exception as e:
+            raise Exception(f"Error al leer la unión {self.ruta}: {str(e)}")
+        
+        if self.clave_fuente not in columnas:
+            raise Exception(f"La columna clave '{self.clave_fuente}' no existe en {self.ruta}")
+        return [f"{self.prefijo}{c}" for c in columnas if c != self.clave_fuente]
+    
+    def cargar_indice(self):
+        """
+        Lee la fuente secundaria y construye el índice clave -> posición de fila.
+        
+        Los valores se guardan en una TablaContactos (columnas con valores
+        internados) y el índice solo apunta a la fila de cada clave.
+        """
+        try:
+            dataframe = pd.read_excel(self.ruta, sheet_name=self.hoja)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el archivo de unión: {self.ruta}")
+        except Exception as e:
+            raise Exception(f"Error al cargar la unión {self.ruta}: {str(e)}")
+        
+        if self.clave_fuente not in dataframe.columns:
+            raise Exception(f"La columna clave '{self.clave_fuente}' no existe en {self.ruta}")
+        
+        claves = dataframe.pop(self.clave_fuente).tolist()
+        self.columnas = [f"{self.prefijo}{c}" for c in dataframe.columns]
+        self.tabla = TablaContactos.desde_dataframe(dataframe)
+        self.indice = {}
+        self.claves_duplicadas = 0
+        self.sin_coincidencia = 0
+        
+        for posicion, clave in enumerate(claves):
+            if pd.isna(clave):
+                continue
+            clave = self.normalizar_clave(clave)
+            if clave in self.indice:
+                # Se conserva la primera aparición de cada clave
+                self.claves_duplicadas += 1
+                continue
+            self.indice[clave] = posicion
+    
+    def buscar(self, clave):
+        """
+        Busca la fila de la fuente secundaria que corresponde a una clave.
+        
+        Returns:
+            tuple: Valores en el orden de self.columnas, o None si no hay coincidencia
+        """
+        posicion = None
+        if clave is not None and clave is not SIN_VALOR and not pd.isna(clave):
+            posicion = self.indice.get(self.normalizar_clave(clave))
+        
+        if posicion is None:
+            self.sin_coincidencia += 1
+            return None
+        return self.tabla.fila(posicion)
+
+
+# =============================================================================
+# CLASE: ProcesadorExcel
+# =============================================================================
+class ProcesadorExcel:
+    """
+    Procesa archivos Excel y extrae información de contactos.
+    """
+    
+    COLUMNAS_CORREO = ['email', 'correo', 'e-mail', 'mail', 'Email', 'Correo']
+    
+    def __init__(self, ruta_excel, hoja=0, uniones=None):
+        """
+        Inicializa el procesador con la ruta del archivo Excel y las uniones opcionales.
+        """
+        self.ruta_excel = ruta_excel
+        self.hoja = hoja
+        self.uniones = uniones or []
+        self.tabla = None
+        self.esquema = None
+        self.planes_uniones = []
+        self.columnas = []
+        self.columnas_uniones = set()
+        
+    def cargar_datos(self):
+        """
+        Carga y valida los datos del archivo Excel y los índices de las uniones.
+        
+        Los contactos se guardan en una TablaContactos y el DataFrame leído se
+        libera durante la conversión.
+        """
+        try:
+            dataframe = pd.read_excel(self.ruta_excel, sheet_name=self.hoja)
+            self.tabla = TablaContactos.desde_dataframe(dataframe)
+            self.columnas = list(self.tabla.esquema.columnas)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el archivo Excel: {self.ruta_excel}")
+        except Exception as e:
+            raise Exception(f"Error al cargar el Excel: {str(e)}")
+        
+        # Los índices de las uniones se construyen una sola vez antes de iterar.
+        # Cada unión aporta solo las columnas que aún no existen: la hoja
+        # principal (y las uniones anteriores) tienen prioridad.
+        self.planes_uniones = []
+        self.columnas_uniones = set()
+        for union in self.uniones:
+            union.cargar_indice()
+            posiciones = {columna: posicion for posicion, columna in enumerate(self.columnas)}
+            aportadas = [(posicion, columna) for posicion, columna in enumerate(union.columnas)
+                         if columna not in posiciones]
+            self.planes_uniones.append(
+                (union, posiciones.get(union.clave_principal), [posicion for posicion, _ in aportadas])
+            )
+            self.columnas += [columna for _, columna in aportadas]
+            self.columnas_uniones.update(columna for _, columna in aportadas)
+        self.esquema = EsquemaContactos(self.columnas)
+        return True
+    
+    def obtener_correo_destino(self, fila):
+        """
+        Busca y retorna el correo electrónico en una fila de datos.
+        """
+        for columna in self.COLUMNAS_CORREO:
+            if columna in fila and pd.notna(fila[columna]):
+                return fila[columna]
+        
+        return None
+    
+    def leer_encabezado(self):
+        """
+        Lee solo la fila de encabezado del Excel, sin cargar los contactos.
+        """
+        try:
+            return pd.read_excel(self.ruta_excel, sheet_name=self.hoja, nrows=0).columns.tolist()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el archivo Excel: {self.ruta_excel}")
+        except Exception as e:
+            raise Exception(f"Error al leer el Excel: {str(e)}")
+    
+    def leer_muestra(self, filas):
+        """
+        Lee solo las primeras filas del Excel como registros de contacto (sin uniones).
+        """
+        try:
+            dataframe = pd.read_excel(self.ruta_excel, sheet_name=self.hoja, nrows=filas)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No se encontró el archivo Excel: {self.ruta_excel}")
+        except Exception as e:
+            raise Exception(f"Error al leer el Excel: {str(e)}")
+        return list(TablaContactos.desde_dataframe(dataframe).registros())
+    
+    def obtener_total_filas(self):
+        """
+        Retorna el número total de filas (contactos) en el Excel.
+        """
+        return len(self.tabla) if self.tabla is not None else 0
+    
+    def iterar_filas(self):
+        """
+        Generador de (índice, registro) con las columnas de la hoja principal.
+        """
+        if self.tabla is None:
+            raise Exception("No hay datos cargados. Ejecute cargar_datos() primero.")
+        
+        yield from enumerate(self.tabla.registros())
+    
+    def combinar_valores(self, valores):
+        """
+        Añade en orden a los valores de una fila las columnas de todas las uniones.
+        
+        Una unión puede usar como clave una columna aportada por una unión anterior.
+        """
+        for union, posicion_clave, aportadas in self.planes_uniones:
+            clave = valores[posicion_clave] if posicion_clave is not None else None
+            fila = union.buscar(clave)
+            if fila is None:
+                valores += (SIN_VALOR,) * len(aportadas)
+            else:
+                valores += tuple(fila[posicion] for posicion in aportadas)
+        return valores
+    
+    def iterar_contactos(self, inicio=0, fin=None):
+        """
+        Generador de (índice, registro) con las columnas de todas las fuentes combinadas.
+        
+        Args:
+            inicio (int): Posición de la primera fila a recorrer (base 0)
+            fin (int): Posición final, excluida (None = hasta el final)
+        """
+        if self.tabla is None:
+            raise Exception("No hay datos cargados. Ejecute cargar_datos() primero.")
+        
+        esquema = self.esquema
+        for index, valores in enumerate(self.tabla.filas(inicio, fin), inicio):
+            if self.planes_uniones:
+                valores = self.combinar_valores(valores)
+            yield index, RegistroContacto(esquema, valores)
+    
+    def analizar_uniones(self, personalizador):
+        """
+        Recorre los contactos antes del primer envío para anticipar las filas sin coincidencia.
+        
+        Los contadores de las uniones se reinician después, de modo que
+        resumen_uniones() al terminar refleja solo el envío.
+        
+        Returns:
+            list: Resumen por unión y filas que se omitirán (vacía si no hay uniones)
+        """
+        if not self.uniones:
+            return []
+        omitidas = sum(1 for _, variables in self.iterar_contactos()
+                       if personalizador.variables_sin_coincidencia(variables, self.columnas_uniones))
+        lineas = self.resumen_uniones()
+        for union in self.uniones:
+            union.sin_coincidencia = 0
+        lineas.append(f"{omitidas} filas se omitirán por no tener coincidencia para variables de las plantillas")
+        return lineas
+    
+    def resumen_uniones(self):
+        """
+        Retorna una línea de resumen por unión (tamaño del índice y filas sin coincidencia).
+        """
+        return [
+            f"{os.path.basename(union.ruta)} por '{union.clave_principal}': "
+            f"{len(union.indice or {})} claves, {union.claves_duplicadas} duplicadas, "
+            f"{union.sin_coincidencia} filas sin coincidencia"
+            for union in self.uniones
+        ]
+
+
+# =============================================================================
+# CLASE: ManejadorBaseDatos
+# =============================================================================
+class ManejadorBaseDatos:
+    """
+    Coordina el proceso de envío masivo utilizando todos los componentes.
+    """
+    
+    def __init__(self, ruta_excel, correo_obj, personalizador, manejador_pausas, uniones=None, programador=None):
+        """
+        Inicializa el manejador de base de datos con todos los componentes necesarios.
+        """
+        self.ruta_excel = ruta_excel
+        self.correo_obj = correo_obj
+        self.personalizador = personalizador
+        self.manejador_pausas = manejador_pausas
+        self.programador = programador
+        self.contador = 0
+        self.omitidos = 0
+        self.procesador_excel = ProcesadorExcel(ruta_excel, uniones=uniones)
+    
+    def enviar_todos(self, interfaz):
+        """
+        Ejecuta el proceso completo de envío masivo de correos.
+        """
+        try:
+            # Cargar datos del Excel
+            self.procesador_excel.cargar_datos()
+            total_correos = self.procesador_excel.obtener_total_filas()
+            interfaz.total_correos = total_correos
+            
+            interfaz.log(f"📤 INICIANDO ENVÍO DE {total_correos} CORREOS")
+            for union in self.procesador_excel.uniones:
+                interfaz.log(f"🔗 Unión cargada: {os.path.basename(union.ruta)} ({len(union.indice)} claves)")
+            for linea in self.procesador_excel.analizar_uniones(self.personalizador):
+                interfaz.log(f"🔗 {linea}")
             interfaz.log("🔄 Procesando...")
             
-            # Iterar sobre cada fila/contacto del Excel
-            for index, fila in self.procesador_excel.iterar_filas():
-                # Verificar si el usuario canceló el envío
-                if not interfaz.enviando:
-                    break
-                    
-                self.contador += 1
-                
-                # Convertir la fila a diccionario para las variables
-                variables = fila.to_dict()
-                
-                # Generar mensaje personalizado usando las variables
-                asunto, cuerpo = self.personalizador.generar_mensaje(**variables)
-                
-                # Obtener el correo del destinatario
-                correo_destino = self.procesador_excel.obtener_correo_destino(fila)
-                
-                if correo_destino:
-                    # Mostrar preparación de envío
-                    interfaz.log(f"📝 Preparando correo {self.contador}/{total_correos} para {correo_destino}")
-                    
-                    # Enviar correo individual
-                    self.correo_obj.enviar_correo(
-                        destinatario=correo_destino,
-                        asunto=asunto,
-                        cuerpo=cuerpo,
-                        variables=variables,
-                        interfaz=interfaz
-                    )
-                    
-                    # Actualizar barra de progreso en la interfaz
-                    interfaz.actualizar_progreso(self.contador, total_correos)
-                    
-                    # Ejecutar pausa estratégica entre envíos
-                    if self.contador < total_correos:
-                        self.manejador_pausas.pausa_estrategica(self.contador, total_correos, interfaz)
-                else:
-                    # Log de advertencia si no se encuentra correo
-                    interfaz.log(f"❌ No se encontró correo destino en la fila {self.contador}")
+            contactos = self.procesador_excel.iterar_contactos()
+            if self.programador is not None:
+                # Reordenar por ventana horaria de cada destinatario
+                contactos = self.programador.programar(
+                    contactos, interfaz, self.manejador_pausas.configurador.obtener_espera_media()
+                )
+            
+            # Iterar sobre cada contacto con las variables de todas las fuentes
+            for index, variables in contactos:
+                # Verificar si el usuario canceló el envío
+                if not interfaz.enviando:
+                    break
+                    
+                self.contador += 1
+                
+                # Fila sin coincidencia en una unión: se omite en lugar de enviar {variable} literal
+                faltantes = self.personalizador.variables_sin_coincidencia(
+                    variables, self.procesador_excel.columnas_uniones
+                )
+                if faltantes:
+                    interfaz.log(f"⚠️ Fila {self.contador} omitida: sin coincidencia en las uniones para "
+                                 f"{', '.join('{' + nombre + '}' for nombre in faltantes)}")
+                    self.omitidos += 1
+                    continue
+                
+                # Generar mensaje personalizado usando las variables
+                asunto, cuerpo = self.personalizador.generar_mensaje(variables)
+                
+                # Obtener el correo del destinatario
+                correo_destino = self.procesador_excel.obtener_correo_destino(variables)
+                
+                if correo_destino:
+                    # Mostrar preparación de envío
+                    interfaz.log(f"📝 Preparando correo {self.contador}/{total_correos} para {correo_destino}")
+                    
+                    # Enviar correo individual
+                    self.correo_obj.enviar_correo(
+                        destinatario=correo_destino,
+                        asunto=asunto,
+                        cuerpo=cuerpo,
+                        variables=variables,
+                        interfaz=interfaz
+                    )
+                    
+                    # Actualizar barra de progreso en la interfaz
+                    interfaz.actualizar_progreso(self.contador, total_correos)
+                    
+                    # Ejecutar pausa estratégica entre envíos
+                    if self.contador < total_correos:
+                        self.manejador_pausas.pausa_estrategica(self.contador, total_correos, interfaz)
+                else:
+                    # Log de advertencia si no se encuentra correo
+                    interfaz.log(f"❌ No se encontró correo destino en la fila {self.contador}")
+                    self.omitidos += 1
+            
+            for linea in self.procesador_excel.resumen_uniones():
+                interfaz.log(f"🔗 {linea}")
+            
+            # Mensaje final según el estado del envío (las filas omitidas no cuentan como enviadas)
+            resumen = f"{self.contador - self.omitidos}/{total_correos} correos enviados"
+            if self.omitidos:
+                resumen += f", {self.omitidos} filas omitidas"
+            if interfaz.enviando:
+                interfaz.log(f"✅ ENVÍO COMPLETADO: {resumen}")
+                messagebox.showinfo("Éxito", f"Envio completado: {resumen}")
+            else:
+                interfaz.log(f"⏹️ ENVÍO INTERRUMPIDO: {resumen}")
+                
+        except Exception as e:
+            # Manejo de errores generales
+            interfaz.log(f"❌ Error inesperado: {e}")
+            messagebox.showerror("Error", f"Error en el proceso: {str(e)}")
+        finally:
+            self.correo_obj.cerrar()
+
+
+# =============================================================================
+# CLASE: ExportadorCampana
+# =============================================================================
+# Contexto de cada proceso del pool de exportación (se crea una vez por proceso
+# para que el adjunto se codifique una sola vez por núcleo)
+_CONTEXTO_EXPORTACION = {}
+
+
+def _inicializar_proceso_exportacion(configuracion):
+    """Prepara personalizador, serializador y procesador en cada proceso del pool."""
+    personalizador = PersonalizadorMensaje()
+    personalizador.formato_asunto = configuracion["formato_asunto"]
+    personalizador.formato_cuerpo = configuracion["formato_cuerpo"]
+    
+    _CONTEXTO_EXPORTACION.clear()
+    _CONTEXTO_EXPORTACION.update(configuracion)
+    _CONTEXTO_EXPORTACION["personalizador"] = personalizador
+    _CONTEXTO_EXPORTACION["serializador"] = SerializadorMIME(configuracion["archivo_adjunto"])
+    _CONTEXTO_EXPORTACION["procesador"] = ProcesadorExcel(configuracion["ruta_excel"])
+
+
+def _exportar_lote(numero_lote, primera_fila, registros):
+    """
+    Renderiza y escribe un lote de contactos en el proceso actual.
+    
+    Returns:
+        list: Entradas del manifiesto (fila, destinatario, asunto, archivo, bytes, estado)
+    """
+    contexto = _CONTEXTO_EXPORTACION
+    personalizador = contexto["personalizador"]
+    serializador = contexto["serializador"]
+    procesador = contexto["procesador"]
+    directorio = contexto["directorio_salida"]
+    adjuntar = contexto["adjuntar"]
+    
+    buzon = None
+    if contexto["formato"] == "mbox":
+        ruta_parcial = os.path.join(directorio, f".lote_{numero_lote:06d}.mbox")
+        buzon = mailbox.mbox(ruta_parcial)
+        buzon.lock()
+    
+    entradas = []
+    try:
+        for desplazamiento, variables in enumerate(registros):
+            fila = primera_fila + desplazamiento
+            asunto, cuerpo = personalizador.generar_mensaje(variables)
+            correo_destino = procesador.obtener_correo_destino(variables)
+            
+            if not correo_destino:
+                entradas.append((fila, "", asunto, "", 0, "sin correo destino"))
+                continue
+            if personalizador.variables_sin_coincidencia(variables, contexto["columnas_uniones"]):
+                entradas.append((fila, correo_destino, asunto, "", 0, "sin coincidencia en uniones"))
+                continue
+            
+            cabeceras, partes = serializador.componer(contexto["remitente"], correo_destino, asunto, cuerpo, adjuntar)
+            firma = None
+            if contexto["dkim"]:
+                # Cada proceso del pool de exportación firma con su propia caché de clave y adjunto
+                firma = _firmar_mensaje_dkim(contexto["dkim"], cabeceras, partes,
+                                             contexto["archivo_adjunto"] if adjuntar else "")
+            bloques = serializador.serializar(cabeceras, partes, para_smtp=False, firma=firma)
+            
+            if buzon is not None:
+                # mbox usa saltos de línea LF; el módulo mailbox aplica el escape de "From "
+                datos = b"".join(bloques).replace(b"\r\n", b"\n")
+                buzon.add(datos)
+                entradas.append((fila, correo_destino, asunto, ExportadorCampana.NOMBRE_MBOX, len(datos), "ok"))
+            else:
+                nombre = f"{fila:06d}_{re.sub(r'[^A-Za-z0-9@._-]', '_', str(correo_destino))}.eml"
+                tamano = 0
+                with open(os.path.join(directorio, nombre), "wb") as f:
+                    for bloque in bloques:
+                        tamano += f.write(bloque)
+                entradas.append((fila, correo_destino, asunto, nombre, tamano, "ok"))
+    finally:
+        if buzon is not None:
+            buzon.unlock()
+            buzon.close()
+    
+    return entradas
+
+
+class ExportadorCampana:
+    """
+    Exporta una campaña completa a archivos .eml (o un único mbox) sin enviar nada.
+    
+    El renderizado y la construcción MIME se reparten por lotes entre un pool
+    de procesos para aprovechar todos los núcleos en hojas grandes.
+    """
+    
+    NOMBRE_MANIFIESTO = "manifiesto.csv"
+    NOMBRE_MBOX = "campana.mbox"
+    
+    def __init__(self, ruta_excel, remitente, formato_asunto, formato_cuerpo, directorio_salida,
+                 archivo_adjunto="", adjuntar_archivo=False, formato="eml", procesos=None, tamano_lote=500,
+                 uniones=None, dkim=None):
+        """
+        Inicializa el exportador con la configuración de la campaña.
+        
+        Args:
+            dkim (dict): Configuración de FirmadorDKIM para firmar los mensajes (None = sin firma)
+        """
+        if formato not in ("eml", "mbox"):
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        
+        self.ruta_excel = ruta_excel
+        self.directorio_salida = directorio_salida
+        self.formato = formato
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_lote = tamano_lote
+        self.procesador_excel = ProcesadorExcel(ruta_excel, uniones=uniones)
+        self.configuracion = {
+            "ruta_excel": ruta_excel,
+            "remitente": remitente,
+            "formato_asunto": formato_asunto,
+            "formato_cuerpo": formato_cuerpo,
+            "archivo_adjunto": archivo_adjunto,
+            "adjuntar": bool(adjuntar_archivo and archivo_adjunto and os.path.isfile(archivo_adjunto)),
+            "directorio_salida": directorio_salida,
+            "formato": formato,
+            "dkim": dkim,
+        }
+    
+    def _generar_lotes(self):
+        """
+        Generador de lotes (número, primera fila, registros) sobre los contactos.
+        
+        Las uniones se aplican aquí, en el proceso principal, para que los índices
+        se construyan una sola vez y no en cada proceso del pool.
+        """
+        contactos = self.procesador_excel.iterar_contactos()
+        numero_lote = 0
+        primera_fila = 1
+        while True:
+            registros = [variables for _, variables in itertools.islice(contactos, self.tamano_lote)]
+            if not registros:
+                return
+            yield numero_lote, primera_fila, registros
+            numero_lote += 1
+            primera_fila += len(registros)
+    
+    def exportar(self, interfaz):
+        """
+        Ejecuta la exportación completa y escribe el manifiesto.
+        
+        Returns:
+            str: Ruta del manifiesto generado
+        """
+        self.procesador_excel.cargar_datos()
+        total = self.procesador_excel.obtener_total_filas()
+        os.makedirs(self.directorio_salida, exist_ok=True)
+        
+        # Los procesos del pool no cargan las uniones: reciben qué columnas aportan
+        self.configuracion["columnas_uniones"] = self.procesador_excel.columnas_uniones
+        
+        interfaz.log(f"📦 EXPORTANDO {total} MENSAJES ({self.formato}) con {self.procesos} procesos")
+        personalizador = PersonalizadorMensaje()
+        personalizador.formato_asunto = self.configuracion["formato_asunto"]
+        personalizador.formato_cuerpo = self.configuracion["formato_cuerpo"]
+        for linea in self.procesador_excel.analizar_uniones(personalizador):
+            interfaz.log(f"🔗 {linea}")
+        inicio_tiempo = time.time()
+        
+        entradas = []
+        lotes = self._generar_lotes()
+        pendientes = set()
+        procesadas = 0
+        
+        with ProcessPoolExecutor(max_workers=self.procesos,
+                                 initializer=_inicializar_proceso_exportacion,
+                                 initargs=(self.configuracion,)) as ejecutor:
+            # Mantener una ventana acotada de lotes en vuelo para no serializar la hoja entera
+            for numero_lote, primera_fila, registros in itertools.islice(lotes, self.procesos * 2):
+                pendientes.add(ejecutor.submit(_exportar_lote, numero_lote, primera_fila, registros))
+            
+            while pendientes:
+                completados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in completados:
+                    resultado = futuro.result()
+                    entradas.extend(resultado)
+                    procesadas += len(resultado)
+                    interfaz.actualizar_progreso(procesadas, total)
+                
+                for numero_lote, primera_fila, registros in itertools.islice(lotes, len(completados)):
+                    pendientes.add(ejecutor.submit(_exportar_lote, numero_lote, primera_fila, registros))
+        
+        if self.formato == "mbox":
+            self._unir_mbox_parciales()
+        
+        for linea in self.procesador_excel.resumen_uniones():
+            interfaz.log(f"🔗 {linea}")
+        
+        entradas.sort()
+        ruta_manifiesto = os.path.join(self.directorio_salida, self.NOMBRE_MANIFIESTO)
+        with open(ruta_manifiesto, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["fila", "destinatario", "asunto", "archivo", "bytes", "estado"])
+            escritor.writerows(entradas)
+        
+        exportados = sum(1 for entrada in entradas if entrada[5] == "ok")
+        interfaz.log(f"✅ EXPORTACIÓN COMPLETADA: {exportados}/{total} mensajes en "
+                     f"{time.time() - inicio_tiempo:.1f} s | Manifiesto: {ruta_manifiesto}")
+        return ruta_manifiesto
+    
+    def _unir_mbox_parciales(self):
+        """Concatena en orden los mbox parciales de cada lote en un único archivo."""
+        parciales = sorted(
+            nombre for nombre in os.listdir(self.directorio_salida)
+            if nombre.startswith(".lote_") and nombre.endswith(".mbox")
+        )
+        with open(os.path.join(self.directorio_salida, self.NOMBRE_MBOX), "wb") as destino:
+            for nombre in parciales:
+                ruta = os.path.join(self.directorio_salida, nombre)
+                with open(ruta, "rb") as origen:
+                    shutil.copyfileobj(origen, destino)
+                os.remove(ruta)
+
+
+# =============================================================================
+# CLASE: TrabajoCampana
+# =============================================================================
+class TrabajoCampana:
+    """
+    Representa una campaña en la cola: su configuración y su progreso persistente.
+    
+    La contraseña solo se mantiene en memoria y nunca se guarda en disco.
+    """
+    
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    PAUSADO = "pausado"
+    CANCELADO = "cancelado"
+    COMPLETADO = "completado"
+    ERROR = "error"
+    
+    CAMPOS_PERSISTENTES = (
+        "id", "nombre", "ruta_excel", "formato_asunto", "formato_cuerpo", "remitente",
+        "archivo_adjunto", "adjuntar_archivo", "uniones", "modo_pruebas", "dkim", "estado",
+        "siguiente_fila", "enviados", "fallidos", "total", "proximo_envio", "mensaje",
+    )
+    
+    def __init__(self, nombre, ruta_excel, formato_asunto, formato_cuerpo, remitente, clave="",
+                 archivo_adjunto="", adjuntar_archivo=False, uniones=None, modo_pruebas=False, dkim=None):
+        """
+        Inicializa un trabajo nuevo en estado pendiente.
+        
+        Args:
+            dkim (dict): Configuración de FirmadorDKIM (None = sin firma)
+        """
+        self.id = None
+        self.nombre = nombre
+        self.ruta_excel = ruta_excel
+        self.formato_asunto = formato_asunto
+        self.formato_cuerpo = formato_cuerpo
+        self.remitente = remitente
+        self.clave = clave
+        self.archivo_adjunto = archivo_adjunto
+        self.adjuntar_archivo = adjuntar_archivo
+        self.uniones = list(uniones or [])
+        self.modo_pruebas = modo_pruebas
+        self.dkim = dkim
+        self.estado = self.PENDIENTE
+        self.siguiente_fila = 0
+        self.enviados = 0
+        self.fallidos = 0
+        self.total = 0
+        self.proximo_envio = 0.0
+        self.mensaje = ""
+    
+    def esta_activo(self):
+        """Indica si el planificador debe seguir enviando este trabajo."""
+        return self.estado in (self.PENDIENTE, self.EN_CURSO)
+    
+    def esta_abierto(self):
+        """Indica si el trabajo aún puede terminar (activo o en pausa)."""
+        return self.esta_activo() or self.estado == self.PAUSADO
+    
+    def a_diccionario(self):
+        """Retorna los campos persistentes del trabajo."""
+        return {campo: getattr(self, campo) for campo in self.CAMPOS_PERSISTENTES}
+    
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """Reconstruye un trabajo guardado (sin contraseña)."""
+        trabajo = cls(datos["nombre"], datos["ruta_excel"], datos["formato_asunto"],
+                      datos["formato_cuerpo"], datos["remitente"])
+        for campo in cls.CAMPOS_PERSISTENTES:
+            if campo in datos:
+                setattr(trabajo, campo, datos[campo])
+        return trabajo
+    
+    def crear_componentes(self):
+        """
+        Carga los contactos y crea los componentes de envío de la campaña.
+        
+        Returns:
+            dict: procesador (con datos cargados), personalizador, configurador y correo
+        """
+        procesador = ProcesadorExcel(
+            self.ruta_excel,
+            uniones=[UnionContactos.desde_texto(especificacion) for especificacion in self.uniones]
+        )
+        procesador.cargar_datos()
+        
+        personalizador = PersonalizadorMensaje()
+        personalizador.formato_asunto = self.formato_asunto
+        personalizador.formato_cuerpo = self.formato_cuerpo
+        
+        configurador = ConfiguradorPausas()
+        configurador.set_modo_pruebas(self.modo_pruebas)
+        
+        return {
+            "procesador": procesador,
+            "personalizador": personalizador,
+            "configurador": configurador,
+            "correo": ManejadorCorreo(self.remitente, self.clave, self.archivo_adjunto, self.adjuntar_archivo,
+                                      firmador=FirmadorDKIM(**self.dkim) if self.dkim else None),
+        }
+    
+    def resumen(self):
+        """Retorna una línea de texto con el estado del trabajo."""
+        total = self.total or "?"
+        return (f"#{self.id} {self.nombre} | {self.estado} | fila {self.siguiente_fila}/{total} | "
+                f"enviados {self.enviados} | fallidos {self.fallidos}"
+                + (f" | {self.mensaje}" if self.mensaje else ""))
+
+
+# =============================================================================
+# CLASE: ColaCampanas
+# =============================================================================
+class ColaCampanas:
+    """
+    Cola persistente de campañas guardada en un archivo JSON.
+    
+    Varios procesos pueden compartir el archivo: la línea de comandos cambia
+    estados (pausar, reanudar, cancelar) y el proceso que ejecuta la cola los
+    incorpora al sincronizar, conservando su propio progreso.
+    """
+    
+    # Junto al script, para que la GUI y la línea de comandos compartan la cola desde cualquier directorio
+    RUTA_PREDETERMINADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cola_campanas.json")
+    
+    def __init__(self, ruta=RUTA_PREDETERMINADA):
+        """
+        Inicializa la cola y carga los trabajos guardados, si existen.
+        """
+        self.ruta = ruta
+        self.trabajos = {}
+        self._lock = threading.RLock()
+        self._firma_archivo = None
+        self.sincronizar()
+    
+    def _leer_archivo(self):
+        """Lee los trabajos del archivo; retorna None si no existe."""
+        if not os.path.exists(self.ruta):
+            return None
+        with open(self.ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return [TrabajoCampana.desde_diccionario(d) for d in datos.get("trabajos", [])]
+    
+    def _firma_actual(self):
+        """Identifica la versión del archivo por fecha de modificación y tamaño."""
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+    
+    def sincronizar(self):
+        """
+        Incorpora los cambios hechos en el archivo por otros procesos.
+        
+        Se agregan los trabajos nuevos y se aplican los cambios de estado
+        solicitados externamente; el progreso en memoria tiene prioridad.
+        """
+        with self._lock:
+            firma = self._firma_actual()
+            if firma is None or firma == self._firma_archivo:
+                return
+            
+            for externo in self._leer_archivo() or []:
+                local = self.trabajos.get(externo.id)
+                if local is None:
+                    self.trabajos[externo.id] = externo
+                elif externo.estado != local.estado and self._es_cambio_externo(local.estado, externo.estado):
+                    local.estado = externo.estado
+                    if externo.estado == TrabajoCampana.EN_CURSO:
+                        local.proximo_envio = 0.0
+            self._firma_archivo = firma
+    
+    @staticmethod
+    def _es_cambio_externo(estado_local, estado_externo):
+        """Indica si un cambio de estado proviene de una orden de pausar/reanudar/cancelar."""
+        if estado_local in (TrabajoCampana.CANCELADO, TrabajoCampana.COMPLETADO):
+            return False
+        if estado_externo in (TrabajoCampana.PAUSADO, TrabajoCampana.CANCELADO):
+            return True
+        return estado_externo == TrabajoCampana.EN_CURSO and estado_local in (TrabajoCampana.PAUSADO, TrabajoCampana.ERROR)
+    
+    def guardar(self):
+        """Guarda la cola de forma atómica tras incorporar cambios externos."""
+        with self._lock:
+            self.sincronizar()
+            datos = {"trabajos": [t.a_diccionario() for t in self.trabajos.values()]}
+            temporal = f"{self.ruta}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
+            self._firma_archivo = self._firma_actual()
+    
+    def agregar(self, trabajo):
+        """Agrega un trabajo al final de la cola y lo guarda."""
+        with self._lock:
+            self.sincronizar()
+            trabajo.id = max(self.trabajos, default=0) + 1
+            self.trabajos[trabajo.id] = trabajo
+            self.guardar()
+            return trabajo
+    
+    def obtener(self, id_trabajo):
+        """Retorna el trabajo con el id indicado o None."""
+        return self.trabajos.get(id_trabajo)
+    
+    def listar(self):
+        """Retorna los trabajos en orden de llegada."""
+        with self._lock:
+            return [self.trabajos[i] for i in sorted(self.trabajos)]
+    
+    def cambiar_estado(self, id_trabajo, accion):
+        """
+        Aplica una acción de control sobre un trabajo.
+        
+        Args:
+            accion (str): "pausar", "reanudar" o "cancelar"
+        
+        Returns:
+            tuple: (bool, str) éxito de la operación y mensaje descriptivo
+        """
+        with self._lock:
+            self.sincronizar()
+            trabajo = self.trabajos.get(id_trabajo)
+            if trabajo is None:
+                return False, f"No existe la campaña #{id_trabajo}"
+            
+            if accion == "pausar" and trabajo.esta_activo():
+                trabajo.estado = TrabajoCampana.PAUSADO
+            elif accion == "reanudar" and trabajo.estado in (TrabajoCampana.PAUSADO, TrabajoCampana.ERROR):
+                trabajo.estado = TrabajoCampana.EN_CURSO
+                trabajo.proximo_envio = 0.0
+                trabajo.mensaje = ""
+            elif accion == "cancelar" and trabajo.esta_abierto():
+                trabajo.estado = TrabajoCampana.CANCELADO
+            else:
+                return False, f"No se puede {accion} la campaña #{id_trabajo} en estado {trabajo.estado}"
+            
+            self.guardar()
+            return True, f"Campaña #{id_trabajo}: {trabajo.estado}"
+    
+    def hay_trabajos_abiertos(self):
+        """Indica si queda algún trabajo pendiente, en curso o en pausa."""
+        return any(t.esta_abierto() for t in self.trabajos.values())
+
+
+# =============================================================================
+# CLASE: PresupuestoEnvio
+# =============================================================================
+class PresupuestoEnvio:
+    """
+    Límite de envíos por hora compartido por todas las campañas de un remitente.
+    """
+    
+    VENTANA_SEGUNDOS = 3600
+    
+    def __init__(self, limite_por_hora=None):
+        """
+        Inicializa el presupuesto; sin límite si limite_por_hora es None.
+        """
+        self.limite_por_hora = limite_por_hora
+        self._envios = deque()
+    
+    def segundos_hasta_disponible(self, ahora):
+        """Retorna cuántos segundos faltan para poder enviar otro correo."""
+        if not self.limite_por_hora:
+            return 0
+        while self._envios and self._envios[0] <= ahora - self.VENTANA_SEGUNDOS:
+            self._envios.popleft()
+        if len(self._envios) < self.limite_por_hora:
+            return 0
+        return self._envios[0] + self.VENTANA_SEGUNDOS - ahora
+    
+    def registrar(self, ahora):
+        """Registra un envío realizado."""
+        self._envios.append(ahora)
+
+
+# =============================================================================
+# CLASE: PlanificadorCampanas
+# =============================================================================
+class PlanificadorCampanas:
+    """
+    Ejecuta varias campañas de la cola en un solo hilo de forma cooperativa.
+    
+    Cada campaña conserva su propia política de pausas; mientras una espera,
+    el planificador envía el siguiente correo de la campaña que esté lista
+    antes, reutilizando las conexiones SMTP y el presupuesto de cada remitente.
+    """
+    
+    INTERVALO_MAXIMO_ESPERA = 2
+    
+    def __init__(self, cola, interfaz, pool=None, limite_por_hora=None, terminar_al_vaciar=False):
+        """
+        Inicializa el planificador.
+        
+        Args:
+            cola (ColaCampanas): Cola de trabajos a ejecutar
+            interfaz: Objeto con log() (interfaz gráfica o de consola)
+            pool (PoolConexionesSMTP): Conexiones compartidas entre campañas
+            limite_por_hora (int): Envíos máximos por hora y remitente (None = sin límite)
+            terminar_al_vaciar (bool): Terminar cuando no queden trabajos abiertos
+        """
+        self.cola = cola
+        self.interfaz = interfaz
+        self.pool = pool or PoolConexionesSMTP()
+        self.limite_por_hora = limite_por_hora
+        self.terminar_al_vaciar = terminar_al_vaciar
+        self.presupuestos = {}
+        self.activo = False
+        self._contextos = {}
+        self._despertar = threading.Event()
+    
+    def despertar(self):
+        """Interrumpe la espera actual para reevaluar la cola (tras pausar, reanudar, etc.)."""
+        self._despertar.set()
+    
+    def detener(self):
+        """Solicita la detención del planificador."""
+        self.activo = False
+        self.despertar()
+    
+    def _presupuesto(self, remitente):
+        """Retorna el presupuesto compartido de un remitente."""
+        if remitente not in self.presupuestos:
+            self.presupuestos[remitente] = PresupuestoEnvio(self.limite_por_hora)
+        return self.presupuestos[remitente]
+    
+    def ejecutar(self):
+        """
+        Bucle principal: elige la campaña lista más próxima y envía un correo.
+        """
+        self.activo = True
+        self.interfaz.log("🗂️ Planificador de campañas iniciado")
+        try:
+            while self.activo:
+                self.cola.sincronizar()
+                self._liberar_contextos_inactivos()
+                
+                ahora = time.time()
+                trabajo, listo_en = self._elegir_trabajo(ahora)
+                if trabajo is None:
+                    if self.terminar_al_vaciar and not self.cola.hay_trabajos_abiertos():
+                        break
+                    listo_en = ahora + self.INTERVALO_MAXIMO_ESPERA
+                
+                espera = listo_en - ahora
+                if espera > 0:
+                    # Espera interrumpible; se despierta periódicamente para sincronizar
+                    self._despertar.wait(min(espera, self.INTERVALO_MAXIMO_ESPERA))
+                    self._despertar.clear()
+                    continue
+                
+                self._enviar_siguiente(trabajo)
+        finally:
+            for contexto in self._contextos.values():
+                contexto["correo"].cerrar()
+            self.pool.cerrar_todas()
+            self.activo = False
+            self.interfaz.log("🗂️ Planificador de campañas detenido")
+    
+    def _elegir_trabajo(self, ahora):
+        """
+        Retorna el trabajo activo que puede enviar antes y el instante en que podrá.
+        """
+        mejor, mejor_instante = None, None
+        for trabajo in self.cola.listar():
+            if not trabajo.esta_activo():
+                continue
+            instante = max(trabajo.proximo_envio,
+                           ahora + self._presupuesto(trabajo.remitente).segundos_hasta_disponible(ahora))
+            if mejor is None or instante < mejor_instante:
+                mejor, mejor_instante = trabajo, instante
+        return mejor, mejor_instante
+    
+    def _liberar_contextos_inactivos(self):
+        """Libera los datos cargados de campañas canceladas, terminadas o con error."""
+        for id_trabajo in list(self._contextos):
+            trabajo = self.cola.obtener(id_trabajo)
+            if trabajo is None or trabajo.estado in (TrabajoCampana.CANCELADO, TrabajoCampana.COMPLETADO,
+                                                     TrabajoCampana.ERROR):
+                self._contextos.pop(id_trabajo)["correo"].cerrar()
+    
+    def _preparar_contexto(self, trabajo):
+        """
+        Carga los contactos del trabajo y crea sus componentes de envío.
+        
+        Al reanudar se continúa desde trabajo.siguiente_fila.
+        """
+        contexto = trabajo.crear_componentes()
+        procesador = contexto["procesador"]
+        trabajo.total = procesador.obtener_total_filas()
+        for linea in procesador.analizar_uniones(contexto["personalizador"]):
+            self.interfaz.log(f"🔗 [{trabajo.nombre}] {linea}")
+        contexto["contactos"] = procesador.iterar_contactos(inicio=trabajo.siguiente_fila)
+        self._contextos[trabajo.id] = contexto
+        return contexto
+    
+    def _marcar_error(self, trabajo, mensaje):
+        """Detiene un trabajo por un error que requiere intervención."""
+        trabajo.estado = TrabajoCampana.ERROR
+        trabajo.mensaje = mensaje
+        self.interfaz.log(f"❌ [{trabajo.nombre}] {mensaje}")
+        self.cola.guardar()
+    
+    def _enviar_siguiente(self, trabajo):
+        """
+        Envía el siguiente contacto de un trabajo y programa su próximo envío.
+        """
+        if not trabajo.clave:
+            self._marcar_error(trabajo, "Falta la contraseña del remitente; reanude la campaña indicándola")
+            return
+        
+        contexto = self._contextos.get(trabajo.id)
+        if contexto is None:
+            try:
+                contexto = self._preparar_contexto(trabajo)
+            except Exception as e:
+                self._marcar_error(trabajo, f"No se pudieron cargar los contactos: {e}")
+                return
+        
+        if trabajo.estado == TrabajoCampana.PENDIENTE:
+            trabajo.estado = TrabajoCampana.EN_CURSO
+            self.interfaz.log(f"🚀 [{trabajo.nombre}] Iniciando campaña de {trabajo.total} contactos")
+        
+        try:
+            index, variables = next(contexto["contactos"])
+        except StopIteration:
+            trabajo.estado = TrabajoCampana.COMPLETADO
+            self.interfaz.log(f"✅ [{trabajo.nombre}] CAMPAÑA COMPLETADA: {trabajo.enviados}/{trabajo.total} correos enviados")
+            self.cola.guardar()
+            return
+        
+        trabajo.siguiente_fila += 1
+        procesador = contexto["procesador"]
+        correo_destino = procesador.obtener_correo_destino(variables)
+        
+        if not correo_destino:
+            self.interfaz.log(f"❌ [{trabajo.nombre}] No se encontró correo destino en la fila {trabajo.siguiente_fila}")
+            self.cola.guardar()
+            return
+        
+        faltantes = contexto["personalizador"].variables_sin_coincidencia(variables, procesador.columnas_uniones)
+        if faltantes:
+            self.interfaz.log(f"⚠️ [{trabajo.nombre}] Fila {trabajo.siguiente_fila} omitida: sin coincidencia en las "
+                              f"uniones para {', '.join('{' + nombre + '}' for nombre in faltantes)}")
+            self.cola.guardar()
+            return
+        
+        asunto, cuerpo = contexto["personalizador"].generar_mensaje(variables)
+        correo = contexto["correo"]
+        ahora = time.time()
+        
+        try:
+            smtp = self.pool.obtener(trabajo.remitente, trabajo.clave)
+            bloques = correo.preparar_mensaje(correo_destino, asunto, cuerpo)
+            correo.enviar_por_bloques(smtp, correo_destino, bloques)
+            trabajo.enviados += 1
+            self.interfaz.log(f"✅ [{trabajo.nombre}] Correo enviado a {correo_destino} "
+                              f"({trabajo.siguiente_fila}/{trabajo.total})")
+        except smtplib.SMTPAuthenticationError as e:
+            # Sin credenciales válidas no tiene sentido seguir con esta campaña
+            trabajo.siguiente_fila -= 1
+            self.pool.descartar(trabajo.remitente)
+            self._marcar_error(trabajo, f"Error de autenticación: {e}")
+            return
+        except Exception as e:
+            trabajo.fallidos += 1
+            self.pool.descartar(trabajo.remitente)
+            self.interfaz.log(f"❌ [{trabajo.nombre}] Error al enviar correo a {correo_destino}: {e}")
+        
+        self._presupuesto(trabajo.remitente).registrar(ahora)
+        
+        # Sin pausa tras el último contacto, igual que en el envío individual
+        if trabajo.siguiente_fila < trabajo.total:
+            trabajo.proximo_envio = time.time() + contexto["configurador"].obtener_tiempo_espera()
+        self.cola.guardar()
+
+
+# =============================================================================
+# CLASE: AlmacenDistribuido
+# =============================================================================
+class AlmacenDistribuido:
+    """
+    Almacén de trabajo compartido (SQLite) para repartir una campaña entre
+    varias máquinas.
+    
+    La campaña se divide en rangos de filas que los nodos reclaman con un
+    lease (concesión con vencimiento). Cada reclamación incrementa un token;
+    un nodo solo puede avanzar o cerrar un rango mientras conserve su token,
+    así un nodo que perdió el lease no puede pisar el trabajo de otro.
+    
+    Antes de cada envío la fila se marca como "enviando". Si el lease vence
+    con la marca puesta (el nodo cayó sin saber si el servidor aceptó el
+    correo), la fila pasa a "incierto" al reclamar el rango y no se reenvía.
+    
+    Las rutas de la campaña (Excel, uniones, adjunto y clave DKIM) se guardan
+    relativas a la carpeta de la base de datos, de modo que cada máquina las
+    resuelve aunque monte el volumen compartido en otra ruta (una letra de unidad o /mnt/...).
+    
+    Nota: SQLite depende del bloqueo de archivos del sistema; en volúmenes de
+    red debe usarse un recurso compartido con bloqueo fiable (SMB/NFSv4).
+    """
+    
+    LIBRE = "libre"
+    ASIGNADO = "asignado"
+    COMPLETADO = "completado"
+    
+    ENVIANDO = "enviando"
+    INCIERTO = "incierto"
+    
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS campana (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            configuracion TEXT NOT NULL,
+            total INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rangos (
+            id INTEGER PRIMARY KEY,
+            fila_inicio INTEGER NOT NULL,
+            fila_fin INTEGER NOT NULL,
+            siguiente_fila INTEGER NOT NULL,
+            estado TEXT NOT NULL,
+            nodo TEXT,
+            token INTEGER NOT NULL DEFAULT 0,
+            vence_en REAL NOT NULL DEFAULT 0,
+            reclamaciones INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS resultados (
+            fila INTEGER PRIMARY KEY,
+            destinatario TEXT,
+            estado TEXT NOT NULL,
+            nodo TEXT NOT NULL,
+            mensaje TEXT,
+            momento REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, ruta_bd):
+        """
+        Abre (o crea) la base de datos compartida.
+        """
+        self.ruta_bd = ruta_bd
+        self.directorio = os.path.dirname(os.path.abspath(ruta_bd))
+        # Modo autocommit: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+        self.conexion = sqlite3.connect(ruta_bd, timeout=30, isolation_level=None)
+        self.conexion.executescript(self.ESQUEMA)
+    
+    def cerrar(self):
+        """Cierra la conexión con la base de datos."""
+        self.conexion.close()
+    
+    def _ejecutar_transaccion(self, operacion):
+        """
+        Ejecuta operacion(conexion) dentro de una transacción con bloqueo de escritura.
+        """
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            resultado = operacion(self.conexion)
+        except Exception:
+            self.conexion.execute("ROLLBACK")
+            raise
+        self.conexion.execute("COMMIT")
+        return resultado
+    
+    def _ruta_compartida(self, ruta):
+        """Convierte una ruta local en relativa a la base de datos, con "/" como separador."""
+        if not ruta:
+            return ruta
+        try:
+            return os.path.relpath(os.path.abspath(ruta), self.directorio).replace(os.sep, "/")
+        except ValueError:
+            # Otra unidad en Windows: no hay ruta relativa posible
+            return ruta
+    
+    def _ruta_local(self, ruta):
+        """Resuelve una ruta guardada respecto a la carpeta local de la base de datos."""
+        return os.path.normpath(os.path.join(self.directorio, ruta)) if ruta else ruta
+    
+    @staticmethod
+    def _convertir_rutas(datos, convertir):
+        """
+        Aplica convertir a las rutas de los datos de una campaña (copia).
+        """
+        datos = dict(datos)
+        datos["ruta_excel"] = convertir(datos["ruta_excel"])
+        datos["archivo_adjunto"] = convertir(datos.get("archivo_adjunto", ""))
+        uniones = []
+        for especificacion in datos.get("uniones", []):
+            ruta_hoja, _, claves = especificacion.rpartition(":")
+            ruta, separador, hoja = ruta_hoja.partition("#")
+            uniones.append(f"{convertir(ruta.strip())}{separador}{hoja}:{claves}")
+        datos["uniones"] = uniones
+        if datos.get("dkim"):
+            datos["dkim"] = dict(datos["dkim"], ruta_clave=convertir(datos["dkim"]["ruta_clave"]))
+        return datos
+    
+    def crear_campana(self, trabajo, total, tamano_rango):
+        """
+        Registra la campaña y la divide en rangos de tamano_rango filas.
+        
+        Returns:
+            int: Número de rangos creados
+        """
+        def operacion(bd):
+            if bd.execute("SELECT 1 FROM campana").fetchone():
+                raise Exception(f"La base de datos {self.ruta_bd} ya contiene una campaña")
+            datos = self._convertir_rutas(trabajo.a_diccionario(), self._ruta_compartida)
+            bd.execute("INSERT INTO campana (id, configuracion, total) VALUES (1, ?, ?)",
+                       (json.dumps(datos, ensure_ascii=False), total))
+            rangos = [(inicio, min(inicio + tamano_rango, total), inicio, self.LIBRE)
+                      for inicio in range(0, total, tamano_rango)]
+            bd.executemany("INSERT INTO rangos (fila_inicio, fila_fin, siguiente_fila, estado) VALUES (?, ?, ?, ?)",
+                           rangos)
+            return len(rangos)
+        return self._ejecutar_transaccion(operacion)
+    
+    def obtener_campana(self):
+        """
+        Retorna la campaña registrada como TrabajoCampana (sin contraseña), con
+        las rutas resueltas en esta máquina.
+        """
+        fila = self.conexion.execute("SELECT configuracion FROM campana").fetchone()
+        if fila is None:
+            raise Exception(f"La base de datos {self.ruta_bd} no contiene ninguna campaña")
+        return TrabajoCampana.desde_diccionario(self._convertir_rutas(json.loads(fila[0]), self._ruta_local))
+    
+    def reclamar_rango(self, nodo, duracion_lease):
+        """
+        Asigna al nodo un rango libre o con lease vencido.
+        
+        Las filas que el nodo anterior dejó marcadas como "enviando" pasan a
+        "incierto": pudieron entregarse y no se vuelven a enviar.
+        
+        Returns:
+            tuple: (id, siguiente_fila, fila_fin, token, filas inciertas) o None si no hay rangos disponibles
+        """
+        def operacion(bd):
+            ahora = time.time()
+            fila = bd.execute(
+                "SELECT id, siguiente_fila, fila_fin, token, estado FROM rangos "
+                "WHERE estado = ? OR (estado = ? AND vence_en < ?) ORDER BY id LIMIT 1",
+                (self.LIBRE, self.ASIGNADO, ahora)
+            ).fetchone()
+            if fila is None:
+                return None
+            id_rango, siguiente_fila, fila_fin, token, estado = fila
+            token += 1
+            bd.execute(
+                "UPDATE rangos SET estado = ?, nodo = ?, token = ?, vence_en = ?, "
+                "reclamaciones = reclamaciones + ? WHERE id = ?",
+                (self.ASIGNADO, nodo, token, ahora + duracion_lease, int(estado == self.ASIGNADO), id_rango)
+            )
+            inciertas = bd.execute(
+                "UPDATE resultados SET estado = ?, mensaje = ?, momento = ? "
+                "WHERE estado = ? AND fila >= ? AND fila < ?",
+                (self.INCIERTO, "el nodo perdió el lease durante el envío", ahora,
+                 self.ENVIANDO, siguiente_fila, fila_fin)
+            ).rowcount
+            return id_rango, siguiente_fila, fila_fin, token, inciertas
+        return self._ejecutar_transaccion(operacion)
+    
+    def renovar_lease(self, id_rango, token, duracion_lease):
+        """
+        Extiende el lease de un rango (latido).
+        
+        Returns:
+            bool: False si el nodo ya no es dueño del rango
+        """
+        cursor = self.conexion.execute(
+            "UPDATE rangos SET vence_en = ? WHERE id = ? AND token = ? AND estado = ?",
+            (time.time() + duracion_lease, id_rango, token, self.ASIGNADO)
+        )
+        return cursor.rowcount == 1
+    
+    def fila_procesada(self, fila):
+        """Indica si una fila ya tiene resultado registrado."""
+        return self.conexion.execute("SELECT 1 FROM resultados WHERE fila = ?", (fila,)).fetchone() is not None
+    
+    def _es_dueno(self, bd, id_rango, token):
+        """Indica si el token sigue siendo el vigente del rango (dentro de una transacción)."""
+        return bd.execute(
+            "SELECT 1 FROM rangos WHERE id = ? AND token = ? AND estado = ?", (id_rango, token, self.ASIGNADO)
+        ).fetchone() is not None
+    
+    def marcar_enviando(self, id_rango, token, fila, destinatario, nodo):
+        """
+        Marca una fila como "enviando" justo antes de entregarla al servidor SMTP.
+        
+        Returns:
+            bool: False si el nodo perdió el lease (no debe enviar)
+        """
+        def operacion(bd):
+            if not self._es_dueno(bd, id_rango, token):
+                return False
+            bd.execute(
+                "INSERT OR IGNORE INTO resultados (fila, destinatario, estado, nodo, mensaje, momento) "
+                "VALUES (?, ?, ?, ?, '', ?)",
+                (fila, destinatario, self.ENVIANDO, nodo, time.time())
+            )
+            return True
+        return self._ejecutar_transaccion(operacion)
+    
+    def descartar_envio(self, id_rango, token, fila):
+        """Retira la marca "enviando" de una fila que no llegó a entregarse."""
+        def operacion(bd):
+            if self._es_dueno(bd, id_rango, token):
+                bd.execute("DELETE FROM resultados WHERE fila = ? AND estado = ?", (fila, self.ENVIANDO))
+        self._ejecutar_transaccion(operacion)
+    
+    def registrar_resultado(self, id_rango, token, fila, destinatario, estado, nodo, mensaje=""):
+        """
+        Registra el resultado de una fila y avanza el rango en una sola transacción.
+        
+        El resultado sustituye a la marca "enviando" de la misma fila.
+        
+        Returns:
+            bool: False si el nodo perdió el lease (el resultado no se registra)
+        """
+        def operacion(bd):
+            cursor = bd.execute(
+                "UPDATE rangos SET siguiente_fila = ? WHERE id = ? AND token = ? AND estado = ?",
+                (fila + 1, id_rango, token, self.ASIGNADO)
+            )
+            if cursor.rowcount != 1:
+                return False
+            bd.execute(
+                "INSERT INTO resultados (fila, destinatario, estado, nodo, mensaje, momento) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (fila) DO UPDATE SET destinatario = excluded.destinatario, estado = excluded.estado, "
+                "nodo = excluded.nodo, mensaje = excluded.mensaje, momento = excluded.momento "
+                "WHERE resultados.estado = ?",
+                (fila, destinatario, estado, nodo, mensaje, time.time(), self.ENVIANDO)
+            )
+            return True
+        return self._ejecutar_transaccion(operacion)
+    
+    def completar_rango(self, id_rango, token):
+        """Marca un rango como completado si el nodo aún es su dueño."""
+        cursor = self.conexion.execute(
+            "UPDATE rangos SET estado = ?, vence_en = 0 WHERE id = ? AND token = ?",
+            (self.COMPLETADO, id_rango, token)
+        )
+        return cursor.rowcount == 1
+    
+    def hay_rangos_pendientes(self):
+        """Indica si queda algún rango sin completar."""
+        return self.conexion.execute(
+            "SELECT 1 FROM rangos WHERE estado != ? LIMIT 1", (self.COMPLETADO,)
+        ).fetchone() is not None
+    
+    def resumen(self):
+        """
+        Retorna líneas de texto con el avance global de la campaña.
+        """
+        total = self.conexion.execute("SELECT total FROM campana").fetchone()
+        ahora = time.time()
+        lineas = [f"Filas totales: {total[0] if total else 0}"]
+        
+        for estado, cantidad in self.conexion.execute(
+                "SELECT estado, COUNT(*) FROM rangos GROUP BY estado ORDER BY estado"):
+            lineas.append(f"Rangos {estado}: {cantidad}")
+        
+        vencidos = self.conexion.execute(
+            "SELECT COUNT(*) FROM rangos WHERE estado = ? AND vence_en < ?", (self.ASIGNADO, ahora)
+        ).fetchone()[0]
+        lineas.append(f"Leases vencidos (se reasignarán): {vencidos}")
+        
+        for estado, cantidad in self.conexion.execute(
+                "SELECT estado, COUNT(*) FROM resultados GROUP BY estado ORDER BY estado"):
+            lineas.append(f"Filas {estado}: {cantidad}")
+        
+        for nodo, cantidad in self.conexion.execute(
+                "SELECT nodo, COUNT(*) FROM resultados GROUP BY nodo ORDER BY nodo"):
+            lineas.append(f"Nodo {nodo}: {cantidad} filas")
+        return lineas
+
+
+# =============================================================================
+# CLASE: NodoEnvioDistribuido
+# =============================================================================
+class NodoEnvioDistribuido:
+    """
+    Nodo trabajador: reclama rangos del almacén compartido y los envía con
+    la misma política de pausas que el envío individual.
+    
+    Antes de cada envío se renueva el lease; si se perdió (por ejemplo, tras
+    una desconexión larga), el nodo abandona el rango sin enviar más filas.
+    """
+    
+    DURACION_LEASE = 600
+    INTERVALO_LATIDO = 30
+    ESPERA_SIN_RANGOS = 15
+    
+    def __init__(self, ruta_bd, nodo, clave, interfaz, duracion_lease=DURACION_LEASE, pool=None, rutas=None):
+        """
+        Inicializa el nodo.
+        
+        Args:
+            ruta_bd (str): Base de datos SQLite compartida
+            nodo (str): Identificador único del nodo
+            clave (str): Contraseña del remitente de la campaña
+            interfaz: Objeto con log() (interfaz de consola)
+            rutas (dict): Rutas locales que sustituyen a las de la campaña
+                (ruta_excel, uniones, archivo_adjunto, ruta_clave)
+        """
+        self.almacen = AlmacenDistribuido(ruta_bd)
+        self.nodo = nodo
+        self.clave = clave
+        self.interfaz = interfaz
+        self.duracion_lease = duracion_lease
+        self.pool = pool or PoolConexionesSMTP()
+        self.rutas = {campo: valor for campo, valor in (rutas or {}).items() if valor}
+        self.enviados = 0
+    
+    def ejecutar(self):
+        """
+        Procesa rangos hasta que la campaña esté completa.
+        """
+        trabajo = self.almacen.obtener_campana()
+        trabajo.clave = self.clave
+        for campo in ("ruta_excel", "uniones", "archivo_adjunto"):
+            if campo in self.rutas:
+                setattr(trabajo, campo, self.rutas[campo])
+        if trabajo.dkim and "ruta_clave" in self.rutas:
+            trabajo.dkim = dict(trabajo.dkim, ruta_clave=self.rutas["ruta_clave"])
+        componentes = trabajo.crear_componentes()
+        self.interfaz.log(f"🖧 Nodo {self.nodo} listo para la campaña '{trabajo.nombre}'")
+        for linea in componentes["procesador"].analizar_uniones(componentes["personalizador"]):
+            self.interfaz.log(f"🔗 Nodo {self.nodo}: {linea}")
+        
+        try:
+            while True:
+                rango = self.almacen.reclamar_rango(self.nodo, self.duracion_lease)
+                if rango is None:
+                    if not self.almacen.hay_rangos_pendientes():
+                        break
+                    # Rangos en manos de otros nodos: esperar por si algún lease vence
+                    time.sleep(self.ESPERA_SIN_RANGOS)
+                    continue
+                self._procesar_rango(trabajo, componentes, *rango)
+        finally:
+            componentes["correo"].cerrar()
+            self.pool.cerrar_todas()
+            self.almacen.cerrar()
+        
+        self.interfaz.log(f"✅ Nodo {self.nodo}: campaña completada ({self.enviados} correos enviados por este nodo)")
+    
+    def _procesar_rango(self, trabajo, componentes, id_rango, siguiente_fila, fila_fin, token, inciertas=0):
+        """
+        Envía las filas pendientes de un rango mientras se conserve el lease.
+        """
+        self.interfaz.log(f"📥 Nodo {self.nodo}: rango #{id_rango} (filas {siguiente_fila + 1}-{fila_fin})")
+        if inciertas:
+            self.interfaz.log(f"⚠️ Nodo {self.nodo}: {inciertas} filas del rango #{id_rango} quedaron a medio enviar "
+                              f"por el nodo anterior; se marcan como inciertas y no se reenvían")
+        procesador = componentes["procesador"]
+        correo = componentes["correo"]
+        
+        for fila, (index, variables) in enumerate(procesador.iterar_contactos(siguiente_fila, fila_fin), siguiente_fila):
+            if not self.almacen.renovar_lease(id_rango, token, self.duracion_lease):
+                self.interfaz.log(f"⚠️ Nodo {self.nodo}: lease del rango #{id_rango} perdido; se abandona")
+                return
+            
+            # Fila ya registrada por un nodo anterior que no llegó a avanzar el rango
+            if self.almacen.fila_procesada(fila):
+                continue
             
-            # Mensaje final según el estado del envío
-            if interfaz.enviando:
-                interfaz.log(f"✅ ENVÍO COMPLETADO: {self.contador}/{total_correos} correos enviados")
-                messagebox.showinfo("Éxito", f"Envio completado: {self.contador}/{total_correos} correos enviados")
+            correo_destino = procesador.obtener_correo_destino(variables)
+            if not correo_destino:
+                self.almacen.registrar_resultado(id_rango, token, fila, "", "sin_correo", self.nodo)
+                continue
+            faltantes = componentes["personalizador"].variables_sin_coincidencia(variables, procesador.columnas_uniones)
+            if faltantes:
+                self.almacen.registrar_resultado(id_rango, token, fila, correo_destino, "sin_coincidencia", self.nodo,
+                                                 ", ".join(faltantes))
+                self.interfaz.log(f"⚠️ Nodo {self.nodo}: fila {fila + 1} omitida, sin coincidencia en las uniones")
+                continue
+            
+            asunto, cuerpo = componentes["personalizador"].generar_mensaje(variables)
+            if not self.almacen.marcar_enviando(id_rango, token, fila, correo_destino, self.nodo):
+                self.interfaz.log(f"⚠️ Nodo {self.nodo}: lease del rango #{id_rango} perdido; se abandona")
+                return
+            
+            estado, mensaje = "enviado", ""
+            try:
+                smtp = self.pool.obtener(trabajo.remitente, trabajo.clave)
+                bloques = correo.preparar_mensaje(correo_destino, asunto, cuerpo)
+                correo.enviar_por_bloques(smtp, correo_destino, bloques)
+                self.enviados += 1
+                self.interfaz.log(f"✅ Nodo {self.nodo}: correo enviado a {correo_destino} (fila {fila + 1})")
+            except smtplib.SMTPAuthenticationError as e:
+                # Sin credenciales válidas el nodo se detiene; el lease vencerá y otro nodo seguirá
+                self.almacen.descartar_envio(id_rango, token, fila)
+                self.pool.descartar(trabajo.remitente)
+                raise Exception(f"Error de autenticación en el nodo {self.nodo}: {e}")
+            except Exception as e:
+                estado, mensaje = "error", str(e)
+                self.pool.descartar(trabajo.remitente)
+                self.interfaz.log(f"❌ Nodo {self.nodo}: error al enviar correo a {correo_destino}: {e}")
+            
+            if not self.almacen.registrar_resultado(id_rango, token, fila, correo_destino, estado, self.nodo, mensaje):
+                self.interfaz.log(f"⚠️ Nodo {self.nodo}: lease del rango #{id_rango} perdido; se abandona")
+                return
+            
+            if fila + 1 < procesador.obtener_total_filas():
+                self._pausar_con_latido(id_rango, token, componentes["configurador"].obtener_tiempo_espera())
+        
+        self.almacen.completar_rango(id_rango, token)
+    
+    def _pausar_con_latido(self, id_rango, token, segundos):
+        """
+        Pausa anti-spam que renueva el lease periódicamente para no perder el rango.
+        """
+        fin = time.time() + segundos
+        while True:
+            restante = fin - time.time()
+            if restante <= 0:
+                return
+            time.sleep(min(restante, self.INTERVALO_LATIDO))
+            self.almacen.renovar_lease(id_rango, token, self.duracion_lease)
+
+
+# =============================================================================
+# CLASE: SimuladorCampana
+# =============================================================================
+class SimuladorCampana:
+    """
+    Reproduce una campaña con un reloj virtual y un transporte simulado.
+    
+    Modela pausas, límite por hora, cuota diaria, ventana horaria, fallos y
+    reintentos sin esperar ni enviar nada, para comparar políticas de pausas
+    antes de lanzar un envío real.
+    """
+    
+    def __init__(self, configurador_pausas, programador=None, limite_por_hora=None, cuota_diaria=None,
+                 tasa_fallos=0.0, reintentos=0, espera_reintento=60, latencia_envio=1.0, semilla=None):
+        """
+        Inicializa el simulador.
+        
+        Args:
+            configurador_pausas (ConfiguradorPausas): Política de pausas a evaluar
+            programador (ProgramadorEnvios): Ventana horaria (None = sin restricción)
+            limite_por_hora (int): Envíos máximos por hora (None = sin límite)
+            cuota_diaria (int): Envíos máximos por día natural (None = sin cuota)
+            tasa_fallos (float): Probabilidad de que un intento de envío falle (0-1)
+            reintentos (int): Reintentos por correo fallido
+            espera_reintento (float): Segundos antes de cada reintento
+            latencia_envio (float): Segundos que tarda cada intento de envío
+            semilla (int): Semilla para obtener resultados reproducibles
+        """
+        self.aleatorio = random.Random(semilla)
+        self.configurador = configurador_pausas
+        self.programador = programador or ProgramadorEnvios(
+            VentanaEnvio(dt_time.min, dt_time.max, range(7))
+        )
+        self.limite_por_hora = limite_por_hora
+        self.cuota_diaria = cuota_diaria
+        self.tasa_fallos = tasa_fallos
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.latencia_envio = latencia_envio
+    
+    def momento_local(self, instante):
+        """Convierte un timestamp a la hora local del remitente (zona predeterminada)."""
+        zona = self.programador.zona_predeterminada
+        return datetime.fromtimestamp(instante, tz=zona) if zona else datetime.fromtimestamp(instante)
+    
+    def _dia(self, instante):
+        """Día natural del remitente para la cuota diaria."""
+        return self.momento_local(instante).date()
+    
+    def _inicio_dia_siguiente(self, instante):
+        """Timestamp de la medianoche siguiente en la zona del remitente."""
+        zona = self.programador.zona_predeterminada
+        manana = self._dia(instante) + timedelta(days=1)
+        if zona:
+            return datetime.combine(manana, dt_time.min, tzinfo=zona).timestamp()
+        return datetime.combine(manana, dt_time.min).timestamp()
+    
+    def simular(self, contactos, inicio=None):
+        """
+        Ejecuta la simulación sobre los contactos (pares índice, variables).
+        
+        Cada reintento vuelve a la cola en reloj + espera_reintento y pasa por
+        la misma ventana, límite por hora y cuota diaria que un primer intento.
+        
+        Returns:
+            dict: Duración, envíos, fallos, intentos, histogramas por hora y por día
+        """
+        inicio = inicio if inicio is not None else time.time()
+        reloj = inicio
+        heap, grupos = self.programador.construir_heap(contactos, inicio)
+        restantes = {zona: len(cola) for zona, cola in grupos.items()}
+        total = sum(restantes.values())
+        presupuesto = PresupuestoEnvio(self.limite_por_hora)
+        
+        # Reintentos pendientes: (instante, orden, zona, intento)
+        reintentos = []
+        orden_reintentos = itertools.count()
+        
+        por_hora = Counter()
+        por_dia = Counter()
+        enviados = fallidos = intentos = 0
+        espera_limite = espera_cuota = espera_ventana = espera_pausas = espera_reintentos = 0.0
+        
+        while heap or reintentos:
+            es_reintento = bool(reintentos) and reintentos[0][0] <= reloj
+            if es_reintento:
+                zona = reintentos[0][2]
+                elegible = self.programador.instante_elegible(zona, reloj)
+                if elegible > reloj + 1:
+                    # La ventana de su zona está cerrada: el reintento espera a que abra
+                    _, orden, zona, intento = heapq.heappop(reintentos)
+                    heapq.heappush(reintentos, (elegible, orden, zona, intento))
+                    continue
             else:
-                interfaz.log(f"⏹️ ENVÍO INTERRUMPIDO: {self.contador}/{total_correos} correos enviados")
-                
-        except Exception as e:
-            # Manejo de errores generales
-            interfaz.log(f"❌ Error inesperado: {e}")
-            messagebox.showerror("Error", f"Error en el proceso: {str(e)}")
+                zona, instante = self.programador.tomar_zona(heap, reloj) if heap else (None, float("inf"))
+                if instante is not None:
+                    # Nadie puede enviar aún: avanzar hasta la ventana o el próximo reintento
+                    if reintentos and reintentos[0][0] < instante:
+                        espera_reintentos += reintentos[0][0] - reloj
+                        reloj = reintentos[0][0]
+                    else:
+                        espera_ventana += max(0.0, instante - reloj)
+                        reloj = max(reloj, instante)
+                    continue
+            
+            # Cuota diaria y límite por hora: si obligan a esperar, se revisa de nuevo la ventana
+            if self.cuota_diaria and por_dia[self._dia(reloj)] >= self.cuota_diaria:
+                siguiente = self._inicio_dia_siguiente(reloj)
+                espera_cuota += siguiente - reloj
+                reloj = siguiente
+                if not es_reintento:
+                    self.programador.reprogramar_zona(heap, zona, reloj)
+                continue
+            espera = presupuesto.segundos_hasta_disponible(reloj)
+            if espera > 0:
+                espera_limite += espera
+                reloj += espera
+                if not es_reintento:
+                    self.programador.reprogramar_zona(heap, zona, reloj)
+                continue
+            
+            if es_reintento:
+                intento = heapq.heappop(reintentos)[3]
+            else:
+                restantes[zona] -= 1
+                intento = 0
+            
+            intentos += 1
+            presupuesto.registrar(reloj)
+            por_hora[int(reloj // 3600) * 3600] += 1
+            por_dia[self._dia(reloj)] += 1
+            reloj += self.latencia_envio
+            if self.aleatorio.random() >= self.tasa_fallos:
+                enviados += 1
+            elif intento < self.reintentos:
+                heapq.heappush(reintentos, (reloj + self.espera_reintento, next(orden_reintentos), zona, intento + 1))
+            else:
+                fallidos += 1
+            
+            # Pausa anti-spam entre correos (no tras el último)
+            if enviados + fallidos < total:
+                pausa = self.configurador.obtener_tiempo_espera()
+                espera_pausas += pausa
+                reloj += pausa
+            
+            if not es_reintento and restantes[zona]:
+                self.programador.reprogramar_zona(heap, zona, reloj)
+        
+        return {
+            "inicio": inicio,
+            "fin": reloj,
+            "duracion": reloj - inicio,
+            "total": total,
+            "enviados": enviados,
+            "fallidos": fallidos,
+            "intentos": intentos,
+            "por_hora": por_hora,
+            "por_dia": por_dia,
+            "espera_pausas": espera_pausas,
+            "espera_ventana": espera_ventana,
+            "espera_limite": espera_limite,
+            "espera_cuota": espera_cuota,
+            "espera_reintentos": espera_reintentos,
+        }
+    
+    @staticmethod
+    def formatear_duracion(segundos):
+        """Convierte segundos en texto como "2 d 05:13 h"."""
+        minutos = int(segundos // 60)
+        dias, minutos = divmod(minutos, 24 * 60)
+        horas, minutos = divmod(minutos, 60)
+        return f"{dias} d {horas:02d}:{minutos:02d} h" if dias else f"{horas:02d}:{minutos:02d} h"
+    
+    def informe(self, resultado, titulo=""):
+        """
+        Genera las líneas del informe: duración, volumen horario y uso de cuotas.
+        """
+        lineas = [f"📊 SIMULACIÓN {titulo}".rstrip()]
+        lineas.append(f"   Contactos: {resultado['total']} | Enviados: {resultado['enviados']} | "
+                      f"Fallidos: {resultado['fallidos']} | Intentos: {resultado['intentos']}")
+        lineas.append(f"   Inicio: {self.momento_local(resultado['inicio']):%Y-%m-%d %H:%M} | "
+                      f"Fin estimado: {self.momento_local(resultado['fin']):%Y-%m-%d %H:%M} | "
+                      f"Duración: {self.formatear_duracion(resultado['duracion'])}")
+        lineas.append(f"   Tiempo en pausas: {self.formatear_duracion(resultado['espera_pausas'])} | "
+                      f"fuera de ventana: {self.formatear_duracion(resultado['espera_ventana'])} | "
+                      f"por límite/hora: {self.formatear_duracion(resultado['espera_limite'])} | "
+                      f"por cuota diaria: {self.formatear_duracion(resultado['espera_cuota'])} | "
+                      f"esperando reintentos: {self.formatear_duracion(resultado['espera_reintentos'])}")
+        
+        por_hora = resultado["por_hora"]
+        if por_hora:
+            maximo_hora = max(por_hora.values())
+            uso = f" ({maximo_hora * 100 / self.limite_por_hora:.0f}% del límite de {self.limite_por_hora})" \
+                if self.limite_por_hora else ""
+            lineas.append(f"   Máximo por hora: {maximo_hora}{uso}")
+            
+            # Volumen por hora del día (suma de todos los días de la campaña)
+            por_hora_dia = Counter()
+            for instante, cantidad in por_hora.items():
+                por_hora_dia[self.momento_local(instante).hour] += cantidad
+            mayor = max(por_hora_dia.values())
+            lineas.append("   Envíos por hora del día:")
+            for hora in range(24):
+                cantidad = por_hora_dia.get(hora, 0)
+                barra = "█" * round(cantidad * 40 / mayor) if cantidad else ""
+                lineas.append(f"     {hora:02d}h {cantidad:>7} {barra}")
+        
+        por_dia = resultado["por_dia"]
+        if por_dia:
+            lineas.append("   Envíos por día:")
+            for dia in sorted(por_dia):
+                uso = f" ({por_dia[dia] * 100 / self.cuota_diaria:.0f}% de la cuota de {self.cuota_diaria})" \
+                    if self.cuota_diaria else ""
+                lineas.append(f"     {dia:%Y-%m-%d} {por_dia[dia]:>7}{uso}")
+        return lineas
 
 
 # =============================================================================
@@ -327,17 +3032,36 @@ class ManejadorBaseDatos:
 class ValidadorConfiguracion:
     """
     Valida la configuración del sistema antes del envío masivo.
+    
+    Además de los campos del formulario, la verificación previa comprueba
+    credenciales, variables de las plantillas y esquema del Excel para fallar
+    antes de la primera pausa y no tras horas de envío.
     """
     
-    def __init__(self, remitente, clave, ruta_excel, asunto, cuerpo):
+    FILAS_MUESTRA = 20
+    TIEMPO_ESPERA_SMTP = 15
+    
+    def __init__(self, remitente, clave, ruta_excel, asunto, cuerpo, archivo_adjunto="", adjuntar_archivo=False,
+                 uniones=None, fabrica_smtp=None):
         """
         Inicializa el validador con los datos de configuración.
+        
+        Args:
+            uniones (list): Objetos UnionContactos cuyas columnas también son variables
+            fabrica_smtp (callable): Crea la conexión SMTP (servidor, puerto, timeout);
+                por defecto smtplib.SMTP_SSL, sustituible por un servidor local de pruebas
         """
         self.remitente = remitente
         self.clave = clave
         self.ruta_excel = ruta_excel
         self.asunto = asunto
         self.cuerpo = cuerpo
+        self.archivo_adjunto = archivo_adjunto
+        self.adjuntar_archivo = adjuntar_archivo
+        self.uniones = uniones or []
+        self.fabrica_smtp = fabrica_smtp
+        self.informe = []
+        self.tamano_maximo = 0
     
     def validar_completo(self):
         """
@@ -390,6 +3114,151 @@ class ValidadorConfiguracion:
         if not self.cuerpo.strip():
             return False, "Por favor ingrese el cuerpo del mensaje"
         return True, ""
+    
+    def verificacion_previa(self, probar_smtp=True):
+        """
+        Ejecuta la verificación previa al envío, de la comprobación más barata a la más cara.
+        
+        Campos del formulario, encabezado del Excel frente a las plantillas, muestra
+        de filas y, por último, un único inicio de sesión SMTP.
+        
+        Args:
+            probar_smtp (bool): Si es False se omite el inicio de sesión (p. ej. sin contraseña)
+        
+        Returns:
+            tuple: (bool, mensaje); las estimaciones y avisos quedan en self.informe
+        """
+        self.informe = []
+        pasos = [self.validar_completo if probar_smtp else self.validar_sin_clave,
+                 self.validar_esquema, self.validar_muestra]
+        if probar_smtp:
+            pasos.append(self.probar_credenciales)
+        
+        for paso in pasos:
+            valido, mensaje = paso()
+            if not valido:
+                return False, mensaje
+        return True, "Verificación previa superada"
+    
+    def validar_sin_clave(self):
+        """Ejecuta las validaciones de campos que no dependen de la contraseña."""
+        for valido, mensaje in (self.validar_remitente(), self.validar_excel(),
+                                self.validar_asunto(), self.validar_cuerpo()):
+            if not valido:
+                return False, mensaje
+        return True, ""
+    
+    def validar_esquema(self):
+        """
+        Comprueba las variables de las plantillas frente a los encabezados, sin cargar los datos.
+        """
+        try:
+            columnas = [str(c) for c in ProcesadorExcel(self.ruta_excel).leer_encabezado()]
+            for union in self.uniones:
+                if union.clave_principal not in columnas:
+                    return False, (f"La unión con {os.path.basename(union.ruta)} usa la columna "
+                                   f"'{union.clave_principal}', que no existe")
+                columnas += [str(c) for c in union.leer_encabezado() if str(c) not in columnas]
+        except Exception as e:
+            return False, str(e)
+        
+        if not any(columna in columnas for columna in ProcesadorExcel.COLUMNAS_CORREO):
+            return False, f"El Excel no tiene columna de correo ({', '.join(ProcesadorExcel.COLUMNAS_CORREO)})"
+        
+        plantillas = f"{self.asunto}\n{self.cuerpo}"
+        literales = PersonalizadorMensaje.extraer_llaves_literales(plantillas)
+        if literales:
+            self.informe.append(f"ℹ️ Texto entre llaves que no es una variable, se enviará tal cual: "
+                                f"{', '.join(literales[:3])}" + (" ..." if len(literales) > 3 else ""))
+        
+        desconocidas = []
+        for variable in PersonalizadorMensaje.extraer_variables(plantillas):
+            if variable in columnas:
+                continue
+            parecida = difflib.get_close_matches(variable, columnas, n=1)
+            desconocidas.append(f"{{{variable}}}" + (f" (¿{{{parecida[0]}}}?)" if parecida else ""))
+        if desconocidas:
+            return False, f"Variables de la plantilla sin columna en el Excel: {', '.join(desconocidas)}"
+        return True, ""
+    
+    def validar_muestra(self):
+        """
+        Renderiza una muestra de filas para estimar el coste por mensaje y su tamaño.
+        """
+        adjuntar = bool(self.adjuntar_archivo and self.archivo_adjunto)
+        if adjuntar and not os.path.isfile(self.archivo_adjunto):
+            return False, f"El archivo adjunto no existe: {self.archivo_adjunto}"
+        
+        procesador = ProcesadorExcel(self.ruta_excel)
+        try:
+            muestra = procesador.leer_muestra(self.FILAS_MUESTRA)
+        except Exception as e:
+            return False, str(e)
+        if not muestra:
+            return False, "El Excel no tiene filas de contactos"
+        
+        personalizador = PersonalizadorMensaje()
+        personalizador.formato_asunto = self.asunto
+        personalizador.formato_cuerpo = self.cuerpo
+        serializador = SerializadorMIME(self.archivo_adjunto)
+        if adjuntar:
+            # La codificación del adjunto se hace una vez por envío: no cuenta como coste por mensaje
+            serializador.adjunto_codificado()
+        variables_plantilla = PersonalizadorMensaje.extraer_variables(f"{self.asunto}\n{self.cuerpo}")
+        
+        tamanos = []
+        sin_correo = 0
+        con_vacios = Counter()
+        inicio = time.perf_counter()
+        for variables in muestra:
+            destinatario = procesador.obtener_correo_destino(variables)
+            if not destinatario:
+                sin_correo += 1
+                continue
+            for variable in variables_plantilla:
+                if variable in variables and pd.isna(variables[variable]):
+                    con_vacios[variable] += 1
+            asunto, cuerpo = personalizador.generar_mensaje(variables)
+            cabeceras, partes = serializador.componer(self.remitente, destinatario, asunto, cuerpo, adjuntar)
+            tamanos.append(sum(len(bloque) for bloque in serializador.serializar(cabeceras, partes)))
+        duracion = time.perf_counter() - inicio
+        
+        if not tamanos:
+            return False, f"Ninguna de las primeras {len(muestra)} filas tiene correo destino"
+        
+        self.tamano_maximo = max(tamanos)
+        self.informe.append(f"🧪 Muestra de {len(muestra)} filas: {duracion * 1000 / len(muestra):.2f} ms "
+                            f"de render y MIME por mensaje")
+        self.informe.append(f"📏 Tamaño por mensaje: medio {sum(tamanos) / len(tamanos) / 1024:.1f} KB, "
+                            f"máximo {self.tamano_maximo / 1024:.1f} KB")
+        if sin_correo:
+            self.informe.append(f"⚠️ {sin_correo} de {len(muestra)} filas de la muestra no tienen correo destino")
+        for variable, cantidad in con_vacios.items():
+            self.informe.append(f"⚠️ {{{variable}}} está vacía en {cantidad} filas de la muestra")
+        return True, ""
+    
+    def probar_credenciales(self):
+        """
+        Inicia sesión una sola vez en el servidor SMTP configurado.
+        
+        También compara el mayor mensaje de la muestra con el límite SIZE del servidor.
+        """
+        servidor, puerto = ManejadorCorreo.SERVIDOR_SMTP, ManejadorCorreo.PUERTO_SMTP
+        fabrica = self.fabrica_smtp or smtplib.SMTP_SSL
+        try:
+            with fabrica(servidor, puerto, timeout=self.TIEMPO_ESPERA_SMTP) as smtp:
+                smtp.login(self.remitente, self.clave)
+                limite = smtp.esmtp_features.get("size", "").strip()
+        except smtplib.SMTPAuthenticationError:
+            return False, f"El servidor {servidor} rechazó el usuario o la contraseña de {self.remitente}"
+        except (smtplib.SMTPException, OSError) as e:
+            return False, f"No se pudo iniciar sesión en {servidor}:{puerto}: {e}"
+        
+        self.informe.append(f"🔐 Inicio de sesión correcto en {servidor}")
+        if limite.isdigit() and int(limite) and self.tamano_maximo > int(limite):
+            return False, (f"Los mensajes ({self.tamano_maximo / 1024 / 1024:.1f} MB) superan el límite del "
+                           f"servidor ({int(limite) / 1024 / 1024:.1f} MB)")
+        return True, ""
 
 
 # =============================================================================
@@ -408,6 +3277,10 @@ class GestorInterfaz:
         self.enviando = False
         self.proceso_envio = None
         self.configurador_pausas = ConfiguradorPausas()
+        self.cola = ColaCampanas()
+        self.planificador = None
+        self.programador = None
+        self.dkim = None
     
     def iniciar_envio(self):
         """Inicia el proceso de envío masivo en un hilo separado."""
@@ -421,7 +3294,130 @@ class GestorInterfaz:
             clave=self.interfaz.entry_clave.get(),
             ruta_excel=self.interfaz.entry_excel.get(),
             asunto=self.interfaz.entry_asunto.get(),
-            cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip()
+            cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip()
+        )
+        
+        valido, mensaje = validador.validar_completo()
+        if not valido:
+            messagebox.showerror("Error de Validación", mensaje)
+            return
+        
+        try:
+            self.interfaz.obtener_uniones()
+            self.programador = self.interfaz.obtener_programador()
+            self.dkim = self.interfaz.obtener_configuracion_dkim()
+        except ValueError as e:
+            messagebox.showerror("Error de Validación", str(e))
+            return
+        
+        # Configurar estado de envío
+        self.enviando = True
+        self.interfaz.enviando = True
+        self.interfaz.progress_var.set(0)
+        
+        # Configurar modo pruebas si está activado
+        modo_pruebas = self.interfaz.modo_pruebas_var.get()
+        self.configurador_pausas.set_modo_pruebas(modo_pruebas)
+        
+        if modo_pruebas:
+            self.interfaz.log("🔧 MODO PRUEBAS ACTIVADO - Pausas reducidas a 2 segundos")
+        
+        # Actualizar interfaz
+        self.interfaz.actualizar_estado_botones(envio_activo=True)
+        
+        # Ejecutar en hilo separado para no bloquear la interfaz
+        self.proceso_envio = threading.Thread(target=self._ejecutar_envio)
+        self.proceso_envio.daemon = True
+        self.proceso_envio.start()
+        
+        self.interfaz.log("🚀 Iniciando proceso de envío masivo...")
+    
+    def detener_envio(self):
+        """Detiene el proceso de envío masivo."""
+        if self.enviando:
+            self.enviando = False
+            self.interfaz.enviando = False
+            self.interfaz.actualizar_estado_botones(envio_activo=False)
+            self.interfaz.log("⏹️ Solicitando detención del envío...")
+        else:
+            self.interfaz.log("ℹ️ No hay envío en progreso")
+    
+    def iniciar_exportacion(self):
+        """Exporta la campaña a archivos .eml en un directorio elegido, sin enviar."""
+        if self.enviando:
+            self.interfaz.log("⚠️ Hay un proceso en curso")
+            return
+        
+        validador = ValidadorConfiguracion(
+            remitente=self.interfaz.entry_remitente.get(),
+            clave=self.interfaz.entry_clave.get(),
+            ruta_excel=self.interfaz.entry_excel.get(),
+            asunto=self.interfaz.entry_asunto.get(),
+            cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip()
+        )
+        for valido, mensaje in (validador.validar_excel(), validador.validar_asunto(), validador.validar_cuerpo()):
+            if not valido:
+                messagebox.showerror("Error de Validación", mensaje)
+                return
+        
+        try:
+            uniones = validador.uniones = self.interfaz.obtener_uniones()
+            dkim = self.interfaz.obtener_configuracion_dkim()
+        except ValueError as e:
+            messagebox.showerror("Error de Validación", str(e))
+            return
+        
+        # Variables y columna de correo antes de renderizar: una {variable} mal escrita no se exporta literal
+        valido, mensaje = validador.validar_esquema()
+        if not valido:
+            messagebox.showerror("Verificación previa", mensaje)
+            return
+        for linea in validador.informe:
+            self.interfaz.log(linea)
+        
+        directorio = filedialog.askdirectory(title="Seleccionar carpeta de exportación")
+        if not directorio:
+            return
+        
+        exportador = ExportadorCampana(
+            ruta_excel=self.interfaz.entry_excel.get(),
+            remitente=self.interfaz.entry_remitente.get(),
+            formato_asunto=self.interfaz.entry_asunto.get(),
+            formato_cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip(),
+            directorio_salida=directorio,
+            archivo_adjunto=self.interfaz.entry_archivo.get() if self.interfaz.adjuntar_var.get() else "",
+            adjuntar_archivo=self.interfaz.adjuntar_var.get(),
+            uniones=uniones,
+            dkim=dkim
+        )
+        
+        self.enviando = True
+        self.interfaz.actualizar_estado_botones(envio_activo=True)
+        self.proceso_envio = threading.Thread(target=self._ejecutar_exportacion, args=(exportador,))
+        self.proceso_envio.daemon = True
+        self.proceso_envio.start()
+    
+    def _ejecutar_exportacion(self, exportador):
+        """Método interno que ejecuta la exportación de la campaña."""
+        try:
+            exportador.exportar(self.interfaz)
+        except Exception as e:
+            self.interfaz.log(f"❌ Error en la exportación: {str(e)}")
+            messagebox.showerror("Error", f"Error en la exportación: {str(e)}")
+        finally:
+            self.enviando = False
+            self.interfaz.actualizar_estado_botones(envio_activo=False)
+    
+    def agregar_a_cola(self):
+        """Agrega la configuración actual del formulario como una campaña en la cola."""
+        validador = ValidadorConfiguracion(
+            remitente=self.interfaz.entry_remitente.get(),
+            clave=self.interfaz.entry_clave.get(),
+            ruta_excel=self.interfaz.entry_excel.get(),
+            asunto=self.interfaz.entry_asunto.get(),
+            cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip(),
+            archivo_adjunto=self.interfaz.entry_archivo.get() if self.interfaz.adjuntar_var.get() else "",
+            adjuntar_archivo=self.interfaz.adjuntar_var.get()
         )
         
         valido, mensaje = validador.validar_completo()
@@ -429,47 +3425,116 @@ class GestorInterfaz:
             messagebox.showerror("Error de Validación", mensaje)
             return
         
-        # Configurar estado de envío
-        self.enviando = True
-        self.interfaz.enviando = True
-        self.interfaz.progress_var.set(0)
-        
-        # Configurar modo pruebas si está activado
-        modo_pruebas = self.interfaz.modo_pruebas_var.get()
-        self.configurador_pausas.set_modo_pruebas(modo_pruebas)
-        
-        if modo_pruebas:
-            self.interfaz.log("🔧 MODO PRUEBAS ACTIVADO - Pausas reducidas a 2 segundos")
+        try:
+            validador.uniones = self.interfaz.obtener_uniones()
+            dkim = self.interfaz.obtener_configuracion_dkim()
+        except ValueError as e:
+            messagebox.showerror("Error de Validación", str(e))
+            return
         
-        # Actualizar interfaz
-        self.interfaz.actualizar_estado_botones(envio_activo=True)
+        # Variables y esquema ahora; la contraseña se comprueba en el primer envío de la cola
+        valido, mensaje = validador.verificacion_previa(probar_smtp=False)
+        if not valido:
+            messagebox.showerror("Verificación previa", mensaje)
+            return
+        for linea in validador.informe:
+            self.interfaz.log(linea)
         
-        # Ejecutar en hilo separado para no bloquear la interfaz
-        self.proceso_envio = threading.Thread(target=self._ejecutar_envio)
-        self.proceso_envio.daemon = True
-        self.proceso_envio.start()
+        ruta_excel = self.interfaz.entry_excel.get()
+        nombre = self.interfaz.entry_nombre_campana.get().strip() or os.path.splitext(os.path.basename(ruta_excel))[0]
+        trabajo = self.cola.agregar(TrabajoCampana(
+            nombre=nombre,
+            ruta_excel=ruta_excel,
+            formato_asunto=self.interfaz.entry_asunto.get(),
+            formato_cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip(),
+            remitente=self.interfaz.entry_remitente.get(),
+            clave=self.interfaz.entry_clave.get(),
+            archivo_adjunto=self.interfaz.entry_archivo.get() if self.interfaz.adjuntar_var.get() else "",
+            adjuntar_archivo=self.interfaz.adjuntar_var.get(),
+            uniones=self.interfaz.obtener_especificaciones_uniones(),
+            modo_pruebas=self.interfaz.modo_pruebas_var.get(),
+            dkim=dkim
+        ))
+        self.interfaz.log(f"🗂️ Campaña #{trabajo.id} '{trabajo.nombre}' agregada a la cola")
+        self.interfaz.actualizar_lista_cola()
+        if self.planificador is not None:
+            self.planificador.despertar()
+    
+    def iniciar_cola(self):
+        """Inicia el planificador de campañas en un hilo separado."""
+        if self.planificador is not None and self.planificador.activo:
+            self.interfaz.log("⚠️ La cola ya se está ejecutando")
+            return
         
-        self.interfaz.log("🚀 Iniciando proceso de envío masivo...")
+        self.planificador = PlanificadorCampanas(self.cola, self.interfaz)
+        hilo = threading.Thread(target=self.planificador.ejecutar)
+        hilo.daemon = True
+        hilo.start()
     
-    def detener_envio(self):
-        """Detiene el proceso de envío masivo."""
-        if self.enviando:
-            self.enviando = False
-            self.interfaz.enviando = False
-            self.interfaz.actualizar_estado_botones(envio_activo=False)
-            self.interfaz.log("⏹️ Solicitando detención del envío...")
+    def detener_cola(self):
+        """Detiene el planificador; las campañas conservan su progreso."""
+        if self.planificador is not None and self.planificador.activo:
+            self.planificador.detener()
+            self.interfaz.log("⏹️ Solicitando detención de la cola...")
         else:
-            self.interfaz.log("ℹ️ No hay envío en progreso")
+            self.interfaz.log("ℹ️ La cola no se está ejecutando")
+    
+    def controlar_trabajo(self, accion):
+        """Pausa, reanuda o cancela la campaña seleccionada en la lista de la cola."""
+        id_trabajo = self.interfaz.obtener_trabajo_seleccionado()
+        if id_trabajo is None:
+            messagebox.showerror("Error", "Seleccione una campaña de la cola")
+            return
+        
+        trabajo = self.cola.obtener(id_trabajo)
+        if accion == "reanudar" and not trabajo.clave:
+            # Las contraseñas no se guardan en disco
+            clave = simpledialog.askstring("Contraseña", f"Contraseña de {trabajo.remitente}:", show='*')
+            if not clave:
+                return
+            trabajo.clave = clave
+        
+        valido, mensaje = self.cola.cambiar_estado(id_trabajo, accion)
+        if not valido:
+            messagebox.showerror("Error", mensaje)
+            return
+        
+        self.interfaz.log(f"🗂️ {mensaje}")
+        self.interfaz.actualizar_lista_cola()
+        if self.planificador is not None:
+            self.planificador.despertar()
     
     def _ejecutar_envio(self):
         """Método interno que ejecuta el envío masivo."""
         try:
+            # Verificación previa: credenciales, variables y muestra antes del primer envío
+            adjuntar = self.interfaz.adjuntar_var.get()
+            validador = ValidadorConfiguracion(
+                remitente=self.interfaz.entry_remitente.get(),
+                clave=self.interfaz.entry_clave.get(),
+                ruta_excel=self.interfaz.entry_excel.get(),
+                asunto=self.interfaz.entry_asunto.get(),
+                cuerpo=self.interfaz.text_cuerpo.get('1.0', tk.END).strip(),
+                archivo_adjunto=self.interfaz.entry_archivo.get() if adjuntar else "",
+                adjuntar_archivo=adjuntar,
+                uniones=self.interfaz.obtener_uniones()
+            )
+            self.interfaz.log("🛫 Verificación previa del envío...")
+            valido, mensaje = validador.verificacion_previa()
+            for linea in validador.informe:
+                self.interfaz.log(linea)
+            if not valido:
+                self.interfaz.log(f"❌ Verificación previa fallida: {mensaje}")
+                messagebox.showerror("Verificación previa", mensaje)
+                return
+            
             # Configurar todos los componentes del sistema
             correo = ManejadorCorreo(
                 remitente=self.interfaz.entry_remitente.get(),
                 clave=self.interfaz.entry_clave.get(),
                 archivo_adjunto=self.interfaz.entry_archivo.get() if self.interfaz.adjuntar_var.get() else "",
-                adjuntar_archivo=self.interfaz.adjuntar_var.get()
+                adjuntar_archivo=self.interfaz.adjuntar_var.get(),
+                firmador=FirmadorDKIM(**self.dkim) if self.dkim else None
             )
             
             personalizador = PersonalizadorMensaje()
@@ -482,7 +3547,9 @@ class GestorInterfaz:
                 ruta_excel=self.interfaz.entry_excel.get(),
                 correo_obj=correo,
                 personalizador=personalizador,
-                manejador_pausas=manejador_pausas
+                manejador_pausas=manejador_pausas,
+                uniones=self.interfaz.obtener_uniones(),
+                programador=self.programador
             )
             
             # Ejecutar envío pasando referencia al gestor para control
@@ -517,6 +3584,7 @@ class InterfazGrafica:
         self.enviando = False
         self.progreso = 0
         self.total_correos = 0
+        self._id_refresco_cola = None
         
         # Inicializar gestor de interfaz
         self.gestor = GestorInterfaz(self)
@@ -552,6 +3620,7 @@ class InterfazGrafica:
         self.crear_pestana_mensaje(notebook)
         self.crear_pestana_base_datos(notebook)
         self.crear_pestana_envio(notebook)
+        self.crear_pestana_cola(notebook)
         
         # Área de log de actividad
         self.crear_area_log()
@@ -606,6 +3675,50 @@ class InterfazGrafica:
         # Inicialmente deshabilitado
         self.frame_archivo.grid_remove()
         
+        # Ventana horaria de envío
+        self.ventana_var = tk.BooleanVar()
+        ttk.Checkbutton(frame, text="Respetar ventana horaria de envío", variable=self.ventana_var,
+                       command=self.toggle_ventana).grid(row=4, column=0, sticky='w', padx=10, pady=10)
+        
+        self.frame_ventana = ttk.Frame(frame)
+        self.frame_ventana.grid(row=5, column=0, columnspan=2, sticky='ew', padx=10, pady=5)
+        
+        ttk.Label(self.frame_ventana, text="Ventana (días y horas):").grid(row=0, column=0, sticky='w')
+        self.entry_ventana = ttk.Entry(self.frame_ventana, width=30, font=('Arial', 10))
+        self.entry_ventana.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        self.entry_ventana.insert(0, "L-V 09:00-18:00")
+        
+        ttk.Label(self.frame_ventana, text="Zona horaria predeterminada:").grid(row=1, column=0, sticky='w')
+        self.entry_zona = ttk.Entry(self.frame_ventana, width=30, font=('Arial', 10))
+        self.entry_zona.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        ttk.Label(self.frame_ventana, text="Vacía = zona del equipo. Por contacto: columna 'zona_horaria' (p. ej. America/Bogota)").grid(
+            row=2, column=0, columnspan=2, sticky='w')
+        self.frame_ventana.columnconfigure(1, weight=1)
+        self.frame_ventana.grid_remove()
+        
+        # Firma DKIM
+        self.dkim_var = tk.BooleanVar()
+        ttk.Checkbutton(frame, text="Firmar con DKIM", variable=self.dkim_var,
+                       command=self.toggle_dkim).grid(row=6, column=0, sticky='w', padx=10, pady=10)
+        
+        self.frame_dkim = ttk.Frame(frame)
+        self.frame_dkim.grid(row=7, column=0, columnspan=2, sticky='ew', padx=10, pady=5)
+        
+        ttk.Label(self.frame_dkim, text="Clave privada (PEM):").grid(row=0, column=0, sticky='w')
+        self.entry_dkim_clave = ttk.Entry(self.frame_dkim, width=30, font=('Arial', 10))
+        self.entry_dkim_clave.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        ttk.Button(self.frame_dkim, text="Buscar", command=self.buscar_clave_dkim).grid(row=0, column=2, padx=5, pady=5)
+        
+        ttk.Label(self.frame_dkim, text="Selector:").grid(row=1, column=0, sticky='w')
+        self.entry_dkim_selector = ttk.Entry(self.frame_dkim, width=30, font=('Arial', 10))
+        self.entry_dkim_selector.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        
+        ttk.Label(self.frame_dkim, text="Dominio (vacío = el del remitente):").grid(row=2, column=0, sticky='w')
+        self.entry_dkim_dominio = ttk.Entry(self.frame_dkim, width=30, font=('Arial', 10))
+        self.entry_dkim_dominio.grid(row=2, column=1, padx=5, pady=5, sticky='ew')
+        self.frame_dkim.columnconfigure(1, weight=1)
+        self.frame_dkim.grid_remove()
+        
     def crear_pestana_mensaje(self, notebook):
         """Crea la pestaña de personalización del mensaje."""
         frame = ttk.Frame(notebook)
@@ -616,7 +3729,8 @@ class InterfazGrafica:
         info_frame.grid(row=0, column=0, columnspan=2, sticky='ew', padx=10, pady=10)
         
         info_text = "Puede usar variables como: {nombre}, {empresa}, {fecha}, {telefono}, etc.\n"
-        info_text += "Estas variables se reemplazarán automáticamente con los datos del Excel."
+        info_text += "Estas variables se reemplazarán automáticamente con los datos del Excel\n"
+        info_text += "y de las hojas unidas en la pestaña Base de Datos."
         ttk.Label(info_frame, text=info_text, justify='left').grid(row=0, column=0, sticky='w', padx=10, pady=10)
         
         # Asunto
@@ -685,6 +3799,15 @@ Atentamente,
         # Botón para cargar vista previa
         ttk.Button(frame, text="Cargar Vista Previa", command=self.cargar_vista_previa).grid(row=2, column=1, pady=10)
         
+        # Uniones con otras fuentes de datos
+        ttk.Label(frame, text="Unir con otras hojas:", style='Section.TLabel').grid(row=3, column=0, sticky='nw', padx=10, pady=10)
+        uniones_frame = ttk.Frame(frame)
+        uniones_frame.grid(row=3, column=1, columnspan=2, sticky='ew', padx=10, pady=5)
+        ttk.Label(uniones_frame, text="Una por línea: ruta[#hoja]:columna_clave[=columna_en_la_otra_hoja]").grid(row=0, column=0, sticky='w')
+        self.text_uniones = scrolledtext.ScrolledText(uniones_frame, height=3, font=('Arial', 10))
+        self.text_uniones.grid(row=1, column=0, sticky='ew')
+        uniones_frame.columnconfigure(0, weight=1)
+        
         # Configurar grid weights
         frame.columnconfigure(1, weight=1)
         frame.rowconfigure(1, weight=1)
@@ -729,10 +3852,86 @@ Atentamente,
         self.btn_detener = ttk.Button(btn_frame, text="Detener Envío", command=self.gestor.detener_envio, state='disabled')
         self.btn_detener.pack(side='left', padx=10)
         
+        self.btn_exportar = ttk.Button(btn_frame, text="Exportar .eml", command=self.gestor.iniciar_exportacion)
+        self.btn_exportar.pack(side='left', padx=10)
+        
         # Configurar grid weights
         frame.columnconfigure(0, weight=1)
         frame.rowconfigure(1, weight=1)
         
+    def crear_pestana_cola(self, notebook):
+        """Crea la pestaña de la cola de campañas."""
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text="🗂️ Cola de Campañas")
+        
+        # Nombre de la campaña a agregar
+        ttk.Label(frame, text="Nombre de la campaña:", style='Section.TLabel').grid(row=0, column=0, sticky='w', padx=10, pady=10)
+        self.entry_nombre_campana = ttk.Entry(frame, width=40, font=('Arial', 10))
+        self.entry_nombre_campana.grid(row=0, column=1, padx=10, pady=10, sticky='ew')
+        ttk.Button(frame, text="Agregar configuración actual", command=self.gestor.agregar_a_cola).grid(row=0, column=2, padx=10, pady=10)
+        
+        # Lista de campañas
+        table_frame = ttk.Frame(frame)
+        table_frame.grid(row=1, column=0, columnspan=3, sticky='nsew', padx=10, pady=10)
+        
+        columnas = ('id', 'nombre', 'estado', 'progreso', 'enviados', 'proximo')
+        self.tree_cola = ttk.Treeview(table_frame, columns=columnas, show='headings', height=8, selectmode='browse')
+        encabezados = ('#', 'Campaña', 'Estado', 'Fila', 'Enviados', 'Próximo envío')
+        for columna, encabezado in zip(columnas, encabezados):
+            self.tree_cola.heading(columna, text=encabezado)
+            self.tree_cola.column(columna, width=60 if columna == 'id' else 110)
+        
+        v_scroll = ttk.Scrollbar(table_frame, orient='vertical', command=self.tree_cola.yview)
+        self.tree_cola.configure(yscrollcommand=v_scroll.set)
+        self.tree_cola.grid(row=0, column=0, sticky='nsew')
+        v_scroll.grid(row=0, column=1, sticky='ns')
+        
+        # Botones de control
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=2, column=0, columnspan=3, pady=10)
+        
+        ttk.Button(btn_frame, text="Ejecutar Cola", command=self.gestor.iniciar_cola).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Detener Cola", command=self.gestor.detener_cola).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Pausar", command=lambda: self.gestor.controlar_trabajo("pausar")).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Reanudar", command=lambda: self.gestor.controlar_trabajo("reanudar")).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Cancelar", command=lambda: self.gestor.controlar_trabajo("cancelar")).pack(side='left', padx=5)
+        
+        # Configurar grid weights
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(1, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+        table_frame.rowconfigure(0, weight=1)
+        
+        self.actualizar_lista_cola()
+        
+    def actualizar_lista_cola(self):
+        """Refresca la lista de campañas y se reprograma cada 2 segundos."""
+        seleccion = self.obtener_trabajo_seleccionado()
+        
+        for item in self.tree_cola.get_children():
+            self.tree_cola.delete(item)
+        
+        for trabajo in self.gestor.cola.listar():
+            proximo = ""
+            if trabajo.esta_activo() and trabajo.proximo_envio:
+                proximo = datetime.fromtimestamp(trabajo.proximo_envio).strftime("%H:%M:%S")
+            self.tree_cola.insert('', 'end', iid=str(trabajo.id), values=(
+                trabajo.id, trabajo.nombre, trabajo.estado,
+                f"{trabajo.siguiente_fila}/{trabajo.total or '?'}", trabajo.enviados, proximo
+            ))
+        
+        if seleccion is not None and self.tree_cola.exists(str(seleccion)):
+            self.tree_cola.selection_set(str(seleccion))
+        
+        if self._id_refresco_cola is not None:
+            self.root.after_cancel(self._id_refresco_cola)
+        self._id_refresco_cola = self.root.after(2000, self.actualizar_lista_cola)
+        
+    def obtener_trabajo_seleccionado(self):
+        """Retorna el id de la campaña seleccionada en la cola, o None."""
+        seleccion = self.tree_cola.selection()
+        return int(seleccion[0]) if seleccion else None
+        
     def crear_area_log(self):
         """Crea el área de log en la parte inferior."""
         log_frame = ttk.LabelFrame(self.root, text="📝 Log de Actividad")
@@ -748,6 +3947,63 @@ Atentamente,
         else:
             self.frame_archivo.grid_remove()
             
+    def obtener_especificaciones_uniones(self):
+        """Retorna las líneas no vacías del campo de uniones."""
+        lineas = self.text_uniones.get('1.0', tk.END).splitlines()
+        return [linea.strip() for linea in lineas if linea.strip()]
+            
+    def obtener_uniones(self):
+        """
+        Convierte las líneas del campo de uniones en objetos UnionContactos.
+        """
+        return [UnionContactos.desde_texto(linea) for linea in self.obtener_especificaciones_uniones()]
+            
+    def toggle_ventana(self):
+        """Muestra u oculta la configuración de la ventana horaria."""
+        if self.ventana_var.get():
+            self.frame_ventana.grid()
+        else:
+            self.frame_ventana.grid_remove()
+            
+    def obtener_programador(self):
+        """
+        Crea el programador de envíos según la ventana configurada, o None si no se usa.
+        """
+        if not self.ventana_var.get():
+            return None
+        ventana = VentanaEnvio.desde_texto(self.entry_ventana.get().strip())
+        return ProgramadorEnvios(ventana, self.entry_zona.get().strip())
+            
+    def toggle_dkim(self):
+        """Muestra u oculta la configuración de la firma DKIM."""
+        if self.dkim_var.get():
+            self.frame_dkim.grid()
+        else:
+            self.frame_dkim.grid_remove()
+            
+    def buscar_clave_dkim(self):
+        """Abre diálogo para buscar la clave privada DKIM."""
+        archivo = filedialog.askopenfilename(
+            title="Seleccionar clave privada DKIM",
+            filetypes=[("Claves PEM", "*.pem *.key"), ("Todos los archivos", "*.*")]
+        )
+        if archivo:
+            self.entry_dkim_clave.delete(0, tk.END)
+            self.entry_dkim_clave.insert(0, archivo)
+            
+    def obtener_configuracion_dkim(self):
+        """
+        Retorna la configuración DKIM del formulario, o None si no se firma.
+        """
+        if not self.dkim_var.get():
+            return None
+        return FirmadorDKIM.crear_configuracion(
+            self.entry_dkim_clave.get().strip(),
+            self.entry_dkim_selector.get(),
+            self.entry_dkim_dominio.get(),
+            self.entry_remitente.get()
+        )
+            
     def buscar_archivo(self):
         """Abre diálogo para buscar archivo a adjuntar."""
         archivo = filedialog.askopenfilename(
@@ -864,10 +4120,12 @@ Atentamente,
         """Actualiza el estado de los botones según el estado del envío."""
         if envio_activo:
             self.btn_iniciar.config(state='disabled')
+            self.btn_exportar.config(state='disabled')
             self.btn_detener.config(state='normal')
             self.estado_label.config(text="🟢 ENVIANDO", foreground="green")
         else:
             self.btn_iniciar.config(state='normal')
+            self.btn_exportar.config(state='normal')
             self.btn_detener.config(state='disabled')
             self.estado_label.config(text="🔴 Listo", foreground="red")
         self.root.update()
@@ -877,6 +4135,541 @@ Atentamente,
         self.root.mainloop()
 
 
+# =============================================================================
+# CLASE: InterfazConsola
+# =============================================================================
+class InterfazConsola:
+    """
+    Sustituto de la interfaz gráfica para ejecutar procesos desde la línea de comandos.
+    
+    Expone los mismos métodos que usan los componentes de negocio (log, progreso
+    y estado de pausa) escribiendo en la salida estándar.
+    """
+    
+    def __init__(self):
+        """Inicializa el estado equivalente al de la interfaz gráfica."""
+        self.enviando = True
+        self.progreso = 0
+        self.total_correos = 0
+        self._ultimo_porcentaje = -1
+    
+    def log(self, mensaje):
+        """Escribe un mensaje con timestamp en la consola."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{timestamp}] {mensaje}", flush=True)
+    
+    def actualizar_progreso(self, actual, total):
+        """Muestra el progreso solo cuando cambia el porcentaje entero."""
+        if total > 0:
+            porcentaje = int(actual * 100 / total)
+            if porcentaje != self._ultimo_porcentaje:
+                self._ultimo_porcentaje = porcentaje
+                self.log(f"Progreso: {actual}/{total} ({porcentaje}%)")
+    
+    def actualizar_estado_pausa(self, segundos_restantes):
+        """En consola las pausas ya se registran en el log."""
+        pass
+
+
+# =============================================================================
+# BENCHMARK: Memoria por mensaje con adjuntos grandes
+# =============================================================================
+class _SocketNulo:
+    """Socket simulado que descarta los datos y cuenta los bytes escritos."""
+    
+    def __init__(self):
+        self.bytes_escritos = 0
+    
+    def sendall(self, datos):
+        self.bytes_escritos += len(datos)
+    
+    def close(self):
+        pass
+
+
+class _SMTPNulo(smtplib.SMTP):
+    """
+    Conexión SMTP sin red que acepta cualquier comando, usada para medir
+    el coste de serialización sin depender del servidor.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.sock = _SocketNulo()
+        self._ultimo_comando = ""
+    
+    def ehlo_or_helo_if_needed(self):
+        pass
+    
+    def putcmd(self, cmd, args=""):
+        self._ultimo_comando = cmd.lower()
+        super().putcmd(cmd, args)
+    
+    def getreply(self):
+        if self._ultimo_comando == "data":
+            self._ultimo_comando = ""
+            return 354, b"Iniciar datos"
+        return 250, b"OK"
+
+
+def _medir_envio_aislado(ruta_adjunto, modo, repeticiones):
+    """
+    Envía varios mensajes con adjunto a un transporte nulo y mide la memoria.
+    
+    Se ejecuta en un proceso independiente para que el RSS máximo sea propio.
+    
+    Returns:
+        dict: Memoria adicional máxima (bytes) del primer mensaje y de los siguientes, y RSS máximo
+    """
+    correo = ManejadorCorreo("remitente@gmx.com", "", ruta_adjunto, True)
+    smtp = _SMTPNulo()
+    picos = []
+    
+    tracemalloc.start()
+    for i in range(repeticiones):
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+        destinatario = f"contacto{i}@ejemplo.com"
+        if modo == "send_message":
+            # Ruta original: mensaje completo en memoria y aplanado por smtplib
+            mensaje = EmailMessage()
+            mensaje["From"] = correo.remitente
+            mensaje["To"] = destinatario
+            mensaje["Subject"] = "Benchmark"
+            mensaje.set_content("Cuerpo de prueba")
+            with open(ruta_adjunto, "rb") as f:
+                mensaje.add_attachment(f.read(), maintype="application", subtype="octet-stream",
+                                       filename=os.path.basename(ruta_adjunto))
+            smtp.send_message(mensaje)
+            del mensaje
+        else:
+            bloques = correo.serializador.generar_bloques(
+                correo.remitente, destinatario, "Benchmark", "Cuerpo de prueba", adjuntar=True
+            )
+            correo.enviar_por_bloques(smtp, destinatario, bloques)
+        picos.append(tracemalloc.get_traced_memory()[1] - memoria_inicial)
+    tracemalloc.stop()
+    
+    rss_maximo = None
+    if resource is not None:
+        # ru_maxrss se expresa en KB en Linux
+        rss_maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    
+    return {
+        "pico_primero": picos[0],
+        "pico_siguientes": max(picos[1:]) if len(picos) > 1 else picos[0],
+        "rss_maximo": rss_maximo,
+    }
+
+
+def benchmark_memoria_adjuntos(tamanos_mb=(10, 25), repeticiones=3):
+    """
+    Compara la memoria por mensaje entre smtp.send_message() y el envío por bloques.
+    
+    Args:
+        tamanos_mb (tuple): Tamaños de adjunto a probar, en MB
+        repeticiones (int): Mensajes enviados por medición
+    """
+    def formato_mb(valor):
+        return "N/D" if valor is None else f"{valor / (1024 * 1024):8.1f}"
+    
+    print("Pico = memoria adicional reservada durante el envío de cada mensaje")
+    print(f"{'Adjunto':>8} | {'Modo':<14} | {'Pico 1er msg':>12} | {'Pico sig.':>10} | {'RSS máx':>8}  (MB)")
+    print("-" * 70)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in tamanos_mb:
+            ruta = os.path.join(directorio, f"adjunto_{tamano}mb.bin")
+            with open(ruta, "wb") as f:
+                f.write(os.urandom(tamano * 1024 * 1024))
+            
+            for modo in ("send_message", "bloques"):
+                # Un proceso nuevo por medición para aislar el RSS
+                with ProcessPoolExecutor(max_workers=1) as ejecutor:
+                    resultado = ejecutor.submit(_medir_envio_aislado, ruta, modo, repeticiones).result()
+                print(f"{tamano:>6}MB | {modo:<14} | {formato_mb(resultado['pico_primero']):>12} | "
+                      f"{formato_mb(resultado['pico_siguientes']):>10} | {formato_mb(resultado['rss_maximo']):>8}")
+
+
+# =============================================================================
+# BENCHMARK: Memoria por fila de contactos
+# =============================================================================
+def _generar_hoja_contactos(ruta, filas):
+    """
+    Escribe una hoja de contactos sintética con valores repetidos realistas.
+    """
+    aleatorio = random.Random(0)
+    nombres = [f"Nombre{i}" for i in range(300)]
+    empresas = [f"Empresa {i} S.A." for i in range(2000)]
+    ciudades = [f"Ciudad {i}" for i in range(80)]
+    cargos = [f"Cargo {i}" for i in range(40)]
+    pd.DataFrame({
+        "email": [f"contacto{i}@ejemplo.com" for i in range(filas)],
+        "nombre": [aleatorio.choice(nombres) for _ in range(filas)],
+        "empresa": [aleatorio.choice(empresas) for _ in range(filas)],
+        "ciudad": [aleatorio.choice(ciudades) for _ in range(filas)],
+        "cargo": [aleatorio.choice(cargos) for _ in range(filas)],
+        "id": list(range(filas)),
+        "saldo": [float(aleatorio.randint(0, 3)) for _ in range(filas)],
+        "activo": [aleatorio.random() < 0.5 for _ in range(filas)],
+    }).to_excel(ruta, index=False)
+
+
+def benchmark_memoria_contactos(ruta_excel=None, filas=500_000, muestra_iterrows=20_000):
+    """
+    Compara los bytes por fila de los contactos como DataFrame + dict por fila
+    frente a TablaContactos + RegistroContacto.
+    
+    También comprueba que los registros de la muestra coinciden con
+    iterrows() + to_dict(), tipo incluido (1, 1.0 y True no son intercambiables).
+    
+    Args:
+        ruta_excel (str): Hoja a medir (None = genera una hoja sintética de filas contactos)
+        filas (int): Filas de la hoja sintética
+        muestra_iterrows (int): Filas con las que se cronometra iterrows() + to_dict()
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        if not ruta_excel:
+            ruta_excel = os.path.join(directorio, "contactos.xlsx")
+            print(f"📝 Generando hoja sintética de {filas} contactos...")
+            _generar_hoja_contactos(ruta_excel, filas)
+        
+        print(f"📂 Leyendo {ruta_excel}...")
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        dataframe = pd.read_excel(ruta_excel)
+        gc.collect()
+        bytes_hoja = tracemalloc.get_traced_memory()[0] - base
+    
+    total = len(dataframe)
+    if not total:
+        tracemalloc.stop()
+        print("⚠️ La hoja no tiene contactos")
+        return
+    resultados = []
+    
+    # Ruta anterior: un dict por fila (como iterar_contactos antes de los registros compactos)
+    columnas = dataframe.columns.tolist()
+    inicio = time.perf_counter()
+    gc.collect()
+    antes = tracemalloc.get_traced_memory()[0]
+    diccionarios = [dict(zip(columnas, valores)) for valores in dataframe.itertuples(index=False, name=None)]
+    bytes_diccionarios = tracemalloc.get_traced_memory()[0] - antes
+    segundos_diccionarios = time.perf_counter() - inicio
+    del diccionarios
+    
+    filas_muestra = min(total, muestra_iterrows)
+    gc.collect()
+    antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    esperadas = [fila.to_dict() for _, fila in itertools.islice(dataframe.iterrows(), filas_muestra)]
+    microsegundos_iterrows = (time.perf_counter() - inicio) * 1e6 / filas_muestra
+    # La muestra se conserva para la comprobación final y no cuenta como memoria de la tabla
+    bytes_muestra = tracemalloc.get_traced_memory()[0] - antes
+    
+    resultados.append(("DataFrame (hoja cargada)", bytes_hoja, None))
+    resultados.append(("dict por fila", bytes_diccionarios, segundos_diccionarios))
+    
+    # Ruta compacta: columnas internadas y una tupla por fila
+    tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    tabla = TablaContactos.desde_dataframe(dataframe)
+    del dataframe
+    segundos_tabla = time.perf_counter() - inicio
+    gc.collect()
+    actual, pico = tracemalloc.get_traced_memory()
+    resultados.append(("TablaContactos (hoja cargada)", actual - base - bytes_muestra, segundos_tabla))
+    
+    inicio = time.perf_counter()
+    antes = tracemalloc.get_traced_memory()[0]
+    registros = list(tabla.registros())
+    bytes_registros = tracemalloc.get_traced_memory()[0] - antes
+    resultados.append(("RegistroContacto por fila", bytes_registros, time.perf_counter() - inicio))
+    del registros
+    
+    inicio = time.perf_counter()
+    for _ in itertools.islice(tabla.registros(), filas_muestra):
+        pass
+    microsegundos_registros = (time.perf_counter() - inicio) * 1e6 / filas_muestra
+    tracemalloc.stop()
+    
+    # repr distingue 1, 1.0 y True, y trata igual dos NaN
+    distintas = [
+        posicion for posicion, (registro, esperada) in enumerate(zip(tabla.registros(), esperadas))
+        if {columna: repr(valor) for columna, valor in registro.items()}
+        != {str(columna): repr(valor) for columna, valor in esperada.items()}
+    ]
+    
+    print(f"\n{total} contactos, {len(tabla.esquema.columnas)} columnas")
+    print(f"{'Representación':<30} | {'Bytes/fila':>10} | {'Total MB':>9} | {'Tiempo s':>8}")
+    print("-" * 67)
+    for nombre, bytes_totales, segundos in resultados:
+        tiempo = f"{segundos:8.2f}" if segundos is not None else f"{'-':>8}"
+        print(f"{nombre:<30} | {bytes_totales / total:>10.1f} | {bytes_totales / (1024 * 1024):>9.1f} | {tiempo}")
+    print(f"\nHoja + todas las filas materializadas (p. ej. con ventana de envío): "
+          f"{(bytes_hoja + bytes_diccionarios) / total:.1f} → {(resultados[2][1] + bytes_registros) / total:.1f} bytes/fila")
+    print(f"Pico durante la conversión a TablaContactos: {(pico - base - bytes_muestra) / (1024 * 1024):.1f} MB")
+    print(f"Recorrido por fila (muestra de {filas_muestra} filas, con tracemalloc activo): "
+          f"iterrows() + to_dict() {microsegundos_iterrows:.1f} µs | RegistroContacto {microsegundos_registros:.1f} µs")
+    if distintas:
+        print(f"❌ {len(distintas)} registros difieren de iterrows() + to_dict() (primera fila: {distintas[0] + 1})")
+    else:
+        print(f"✅ Los {filas_muestra} registros de la muestra coinciden con iterrows() + to_dict(), tipos incluidos")
+
+
+# =============================================================================
+# FUNCIÓN: Cola de campañas desde la línea de comandos
+# =============================================================================
+def verificar_campana_cli(args, formato_cuerpo, clave=""):
+    """
+    Ejecuta la verificación previa de una campaña de línea de comandos.
+    
+    Sin contraseña se omite el inicio de sesión SMTP. Termina el programa si falla.
+    """
+    validador = ValidadorConfiguracion(
+        remitente=args.remitente,
+        clave=clave,
+        ruta_excel=args.excel,
+        asunto=args.asunto,
+        cuerpo=formato_cuerpo,
+        archivo_adjunto=args.adjunto,
+        adjuntar_archivo=bool(args.adjunto),
+        uniones=[UnionContactos.desde_texto(especificacion) for especificacion in args.unir]
+    )
+    valido, mensaje = validador.verificacion_previa(probar_smtp=bool(clave))
+    for linea in validador.informe:
+        print(linea)
+    if not valido:
+        print(f"❌ Verificación previa fallida: {mensaje}")
+        sys.exit(1)
+    print(f"✅ {mensaje}")
+
+
+def obtener_configuracion_dkim(args, parser):
+    """Retorna la configuración DKIM de la línea de comandos, o None si no se firma."""
+    if not args.dkim_clave:
+        return None
+    try:
+        return FirmadorDKIM.crear_configuracion(args.dkim_clave, args.dkim_selector, args.dkim_dominio,
+                                                args.remitente)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def ejecutar_accion_dkim(args, parser):
+    """
+    Genera un par de claves DKIM de prueba o verifica un mensaje exportado.
+    """
+    if args.generar_clave_dkim:
+        registro = FirmadorDKIM.generar_claves(args.generar_clave_dkim, args.dkim_selector)
+        print(f"🔑 Claves generadas: {args.generar_clave_dkim}.key (privada) y {args.generar_clave_dkim}.pub (pública)")
+        print(f"   Registro DNS: {registro}")
+        return
+    
+    if not args.dkim_publica:
+        parser.error("--verificar-dkim requiere --dkim-publica con la clave pública PEM")
+    with open(args.verificar_dkim, "rb") as f:
+        mensaje = f.read()
+    with open(args.dkim_publica, "rb") as f:
+        clave_publica = f.read()
+    valido, detalle = FirmadorDKIM.verificar(mensaje, clave_publica)
+    print(f"{'✅' if valido else '❌'} {detalle}")
+    if not valido:
+        sys.exit(1)
+
+
+def ejecutar_accion_cola(args, parser):
+    """
+    Ejecuta una acción (--cola) sobre la cola persistente de campañas.
+    
+    Las órdenes pausar, reanudar y cancelar pueden lanzarse desde otra
+    terminal mientras "ejecutar" está en marcha: se aplican al sincronizar.
+    """
+    cola = ColaCampanas(args.archivo_cola)
+    interfaz = InterfazConsola()
+    
+    if args.cola == "listar":
+        print(f"📂 Cola: {os.path.abspath(cola.ruta)}")
+        trabajos = cola.listar()
+        if not trabajos:
+            print("La cola está vacía")
+        for trabajo in trabajos:
+            print(trabajo.resumen())
+    
+    elif args.cola == "agregar":
+        if not args.excel or not args.cuerpo_archivo or not args.remitente:
+            parser.error("--cola agregar requiere --excel, --cuerpo-archivo y --remitente")
+        for especificacion in args.unir:
+            UnionContactos.desde_texto(especificacion)
+        with open(args.cuerpo_archivo, encoding="utf-8") as f:
+            formato_cuerpo = f.read().strip()
+        verificar_campana_cli(args, formato_cuerpo)
+        trabajo = cola.agregar(TrabajoCampana(
+            nombre=args.nombre or os.path.splitext(os.path.basename(args.excel))[0],
+            ruta_excel=os.path.abspath(args.excel),
+            formato_asunto=args.asunto,
+            formato_cuerpo=formato_cuerpo,
+            remitente=args.remitente,
+            archivo_adjunto=os.path.abspath(args.adjunto) if args.adjunto else "",
+            adjuntar_archivo=bool(args.adjunto),
+            uniones=args.unir,
+            modo_pruebas=args.modo_pruebas,
+            dkim=obtener_configuracion_dkim(args, parser)
+        ))
+        print(f"Campaña agregada: {trabajo.resumen()}")
+    
+    elif args.cola in ("pausar", "reanudar", "cancelar"):
+        if args.id is None:
+            parser.error(f"--cola {args.cola} requiere --id")
+        valido, mensaje = cola.cambiar_estado(args.id, args.cola)
+        print(mensaje)
+        if not valido:
+            sys.exit(1)
+    
+    elif args.cola == "ejecutar":
+        # Las contraseñas no se guardan en disco: se indican al ejecutar
+        clave = args.clave or os.environ.get("CLAVE_SMTP", "")
+        for trabajo in cola.listar():
+            if not args.remitente or trabajo.remitente == args.remitente:
+                trabajo.clave = clave
+        planificador = PlanificadorCampanas(cola, interfaz, limite_por_hora=args.limite_hora,
+                                            terminar_al_vaciar=True)
+        try:
+            planificador.ejecutar()
+        except KeyboardInterrupt:
+            interfaz.log("⏹️ Interrumpido; el progreso queda guardado en la cola")
+
+
+# =============================================================================
+# FUNCIÓN: Envío distribuido desde la línea de comandos
+# =============================================================================
+def ejecutar_accion_distribuida(args, parser):
+    """
+    Ejecuta una acción (--distribuido) sobre el almacén compartido.
+    
+    "crear" divide la campaña en rangos (coordinador), "nodo" arranca un
+    trabajador en esta máquina y "estado" muestra el avance global.
+    """
+    if not args.bd:
+        parser.error("--distribuido requiere --bd con la ruta de la base de datos compartida")
+    interfaz = InterfazConsola()
+    
+    if args.distribuido == "crear":
+        if not args.excel or not args.cuerpo_archivo or not args.remitente:
+            parser.error("--distribuido crear requiere --excel, --cuerpo-archivo y --remitente")
+        for especificacion in args.unir:
+            UnionContactos.desde_texto(especificacion)
+        with open(args.cuerpo_archivo, encoding="utf-8") as f:
+            formato_cuerpo = f.read().strip()
+        verificar_campana_cli(args, formato_cuerpo)
+        
+        trabajo = TrabajoCampana(
+            nombre=args.nombre or os.path.splitext(os.path.basename(args.excel))[0],
+            ruta_excel=os.path.abspath(args.excel),
+            formato_asunto=args.asunto,
+            formato_cuerpo=formato_cuerpo,
+            remitente=args.remitente,
+            archivo_adjunto=os.path.abspath(args.adjunto) if args.adjunto else "",
+            adjuntar_archivo=bool(args.adjunto),
+            uniones=args.unir,
+            modo_pruebas=args.modo_pruebas,
+            dkim=obtener_configuracion_dkim(args, parser)
+        )
+        procesador = ProcesadorExcel(trabajo.ruta_excel)
+        procesador.cargar_datos()
+        
+        almacen = AlmacenDistribuido(args.bd)
+        try:
+            rangos = almacen.crear_campana(trabajo, procesador.obtener_total_filas(), args.tamano_rango)
+        finally:
+            almacen.cerrar()
+        interfaz.log(f"🖧 Campaña '{trabajo.nombre}' dividida en {rangos} rangos de hasta {args.tamano_rango} filas")
+    
+    elif args.distribuido == "nodo":
+        nodo = args.nodo or f"{socket.gethostname()}-{os.getpid()}"
+        clave = args.clave or os.environ.get("CLAVE_SMTP", "")
+        # Rutas locales opcionales si este equipo no ve los archivos donde indica la campaña
+        rutas = {
+            "ruta_excel": args.excel,
+            "uniones": args.unir,
+            "archivo_adjunto": args.adjunto,
+            "ruta_clave": args.dkim_clave,
+        }
+        NodoEnvioDistribuido(args.bd, nodo, clave, interfaz, duracion_lease=args.duracion_lease,
+                             rutas=rutas).ejecutar()
+    
+    elif args.distribuido == "estado":
+        almacen = AlmacenDistribuido(args.bd)
+        try:
+            for linea in almacen.resumen():
+                print(linea)
+        finally:
+            almacen.cerrar()
+
+
+def ejecutar_simulacion(args, parser):
+    """
+    Simula la campaña (--simular) con cada política de pausas y compara resultados.
+    
+    Los contactos salen de --excel (con sus zonas horarias) o de --contactos N.
+    """
+    if args.excel:
+        procesador = ProcesadorExcel(args.excel, uniones=[UnionContactos.desde_texto(e) for e in args.unir])
+        procesador.cargar_datos()
+        contactos = list(procesador.iterar_contactos())
+    elif args.contactos:
+        contactos = [(i, {}) for i in range(args.contactos)]
+    else:
+        parser.error("--simular requiere --excel o --contactos")
+    
+    try:
+        programador = None
+        if args.ventana or args.zona:
+            ventana = VentanaEnvio.desde_texto(args.ventana or "00:00-23:59")
+            programador = ProgramadorEnvios(ventana, args.zona)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    politicas = args.pausas or ["pruebas" if args.modo_pruebas else "60-180"]
+    inicio = time.time()
+    filas = []
+    for politica in politicas:
+        configurador = ConfiguradorPausas(random.Random(args.semilla))
+        if politica == "pruebas":
+            configurador.set_modo_pruebas(True)
+        else:
+            try:
+                configurador.min_segundos, configurador.max_segundos = (int(s) for s in politica.split("-"))
+            except ValueError:
+                parser.error(f"Política de pausas no válida (use MIN-MAX o 'pruebas'): {politica}")
+        
+        simulador = SimuladorCampana(
+            configurador,
+            programador=programador,
+            limite_por_hora=args.limite_hora,
+            cuota_diaria=args.cuota_diaria,
+            tasa_fallos=args.tasa_fallos,
+            reintentos=args.reintentos,
+            espera_reintento=args.espera_reintento,
+            latencia_envio=args.latencia,
+            semilla=args.semilla
+        )
+        resultado = simulador.simular(contactos, inicio)
+        for linea in simulador.informe(resultado, f"pausas {politica}"):
+            print(linea)
+        print()
+        filas.append((politica, resultado, simulador))
+    
+    if len(filas) > 1:
+        print("⚖️ COMPARACIÓN DE POLÍTICAS")
+        print(f"   {'Pausas':<12} {'Duración':>14} {'Fin estimado':>17} {'Máx/hora':>9} {'Máx/día':>8} {'Fallidos':>9}")
+        for politica, resultado, simulador in filas:
+            fin = f"{simulador.momento_local(resultado['fin']):%Y-%m-%d %H:%M}"
+            print(f"   {politica:<12} {simulador.formatear_duracion(resultado['duracion']):>14} "
+                  f"{fin:>17} {max(resultado['por_hora'].values(), default=0):>9} "
+                  f"{max(resultado['por_dia'].values(), default=0):>8} {resultado['fallidos']:>9}")
+
+
 # =============================================================================
 # FUNCIÓN PRINCIPAL
 # =============================================================================
@@ -884,6 +4677,132 @@ def main():
     """
     Función principal que inicia la aplicación.
     """
+    parser = argparse.ArgumentParser(description="Sistema de envío masivo de correos personalizados")
+    parser.add_argument("--benchmark-memoria", action="store_true",
+                        help="Mide la memoria por mensaje con adjuntos de 10 y 25 MB y termina")
+    parser.add_argument("--benchmark-contactos", action="store_true",
+                        help="Mide los bytes por fila de los contactos (--excel o una hoja sintética de --contactos filas)")
+    parser.add_argument("--exportar", metavar="DIRECTORIO",
+                        help="Renderiza la campaña a .eml/mbox en DIRECTORIO sin enviar correos")
+    parser.add_argument("--excel", help="Archivo Excel con los contactos")
+    parser.add_argument("--unir", action="append", default=[], metavar="RUTA[#HOJA]:CLAVE[=CLAVE_FUENTE]",
+                        help="Une otra hoja por columna clave (se puede repetir)")
+    parser.add_argument("--remitente", default="", help="Correo remitente")
+    parser.add_argument("--asunto", default="", help="Plantilla del asunto")
+    parser.add_argument("--cuerpo-archivo", help="Archivo de texto con la plantilla del cuerpo")
+    parser.add_argument("--adjunto", default="", help="Archivo a adjuntar (opcional)")
+    parser.add_argument("--formato", choices=("eml", "mbox"), default="eml", help="Formato de exportación")
+    parser.add_argument("--procesos", type=int, help="Procesos para la exportación (por defecto, todos los núcleos)")
+    parser.add_argument("--tamano-lote", type=int, default=500, help="Filas por lote de trabajo")
+    parser.add_argument("--cola", choices=("listar", "agregar", "pausar", "reanudar", "cancelar", "ejecutar"),
+                        help="Gestiona la cola persistente de campañas")
+    parser.add_argument("--archivo-cola", default=ColaCampanas.RUTA_PREDETERMINADA, help="Archivo JSON de la cola")
+    parser.add_argument("--id", type=int, help="Id de la campaña para pausar, reanudar o cancelar")
+    parser.add_argument("--nombre", default="", help="Nombre de la campaña al agregarla a la cola")
+    parser.add_argument("--modo-pruebas", action="store_true", help="Pausas de 2 segundos para la campaña")
+    parser.add_argument("--clave", default="", help="Contraseña del remitente (o variable de entorno CLAVE_SMTP)")
+    parser.add_argument("--limite-hora", type=int, help="Máximo de envíos por hora y remitente en la cola")
+    parser.add_argument("--distribuido", choices=("crear", "nodo", "estado"),
+                        help="Envío repartido entre varias máquinas mediante una base de datos compartida")
+    parser.add_argument("--bd", help="Base de datos SQLite compartida del envío distribuido")
+    parser.add_argument("--tamano-rango", type=int, default=100, help="Filas por rango en el envío distribuido")
+    parser.add_argument("--nodo", default="", help="Nombre del nodo (por defecto, equipo y proceso)")
+    parser.add_argument("--duracion-lease", type=int, default=NodoEnvioDistribuido.DURACION_LEASE,
+                        help="Segundos sin latido tras los cuales otro nodo puede reclamar un rango")
+    parser.add_argument("--simular", action="store_true",
+                        help="Simula la campaña con un reloj virtual sin enviar ni esperar")
+    parser.add_argument("--contactos", type=int, help="Número de contactos a simular si no se indica --excel")
+    parser.add_argument("--pausas", action="append", default=[], metavar="MIN-MAX",
+                        help="Política de pausas en segundos o 'pruebas' (se puede repetir para comparar)")
+    parser.add_argument("--cuota-diaria", type=int, help="Máximo de envíos por día del proveedor")
+    parser.add_argument("--tasa-fallos", type=float, default=0.0, help="Probabilidad de fallo por intento (0-1)")
+    parser.add_argument("--reintentos", type=int, default=0, help="Reintentos por correo fallido")
+    parser.add_argument("--espera-reintento", type=float, default=60, help="Segundos antes de cada reintento")
+    parser.add_argument("--latencia", type=float, default=1.0, help="Segundos que tarda cada envío")
+    parser.add_argument("--ventana", default="", help='Ventana de envío, p. ej. "L-V 09:00-18:00"')
+    parser.add_argument("--zona", default="", help="Zona horaria predeterminada de los destinatarios")
+    parser.add_argument("--semilla", type=int, help="Semilla para simulaciones reproducibles")
+    parser.add_argument("--dkim-clave", help="Clave privada PEM para firmar con DKIM (exportar, cola, distribuido)")
+    parser.add_argument("--dkim-selector", default="prueba", help="Selector DKIM (etiqueta s=)")
+    parser.add_argument("--dkim-dominio", default="", help="Dominio DKIM (por defecto, el del remitente)")
+    parser.add_argument("--generar-clave-dkim", metavar="PREFIJO",
+                        help="Genera PREFIJO.key y PREFIJO.pub de prueba y muestra el registro DNS")
+    parser.add_argument("--verificar-dkim", metavar="ARCHIVO_EML", help="Verifica la firma DKIM de un mensaje exportado")
+    parser.add_argument("--dkim-publica", help="Clave pública PEM para --verificar-dkim")
+    parser.add_argument("--verificar-configuracion", action="store_true",
+                        help="Verificación previa de la campaña (con --clave o CLAVE_SMTP incluye el inicio de sesión)")
+    args = parser.parse_args()
+    
+    if args.benchmark_memoria:
+        benchmark_memoria_adjuntos()
+        return
+    
+    if args.benchmark_contactos:
+        benchmark_memoria_contactos(args.excel, args.contactos or 500_000)
+        return
+    
+    if args.exportar:
+        if not args.excel or not args.cuerpo_archivo:
+            parser.error("--exportar requiere --excel y --cuerpo-archivo")
+        with open(args.cuerpo_archivo, encoding="utf-8") as f:
+            formato_cuerpo = f.read().strip()
+        uniones = [UnionContactos.desde_texto(especificacion) for especificacion in args.unir]
+        # Solo esquema: exportar no necesita contraseña ni servidor SMTP
+        validador = ValidadorConfiguracion(
+            remitente=args.remitente,
+            clave="",
+            ruta_excel=args.excel,
+            asunto=args.asunto,
+            cuerpo=formato_cuerpo,
+            uniones=uniones
+        )
+        valido, mensaje = validador.validar_esquema()
+        for linea in validador.informe:
+            print(linea)
+        if not valido:
+            print(f"❌ Verificación previa fallida: {mensaje}")
+            sys.exit(1)
+        exportador = ExportadorCampana(
+            ruta_excel=args.excel,
+            remitente=args.remitente,
+            formato_asunto=args.asunto,
+            formato_cuerpo=formato_cuerpo,
+            directorio_salida=args.exportar,
+            archivo_adjunto=args.adjunto,
+            adjuntar_archivo=bool(args.adjunto),
+            formato=args.formato,
+            procesos=args.procesos,
+            tamano_lote=args.tamano_lote,
+            uniones=uniones,
+            dkim=obtener_configuracion_dkim(args, parser)
+        )
+        exportador.exportar(InterfazConsola())
+        return
+    
+    if args.cola:
+        ejecutar_accion_cola(args, parser)
+        return
+    
+    if args.distribuido:
+        ejecutar_accion_distribuida(args, parser)
+        return
+    
+    if args.simular:
+        ejecutar_simulacion(args, parser)
+        return
+    
+    if args.generar_clave_dkim or args.verificar_dkim:
+        ejecutar_accion_dkim(args, parser)
+        return
+    
+    if args.verificar_configuracion:
+        if not args.excel or not args.cuerpo_archivo or not args.remitente:
+            parser.error("--verificar-configuracion requiere --excel, --cuerpo-archivo y --remitente")
+        with open(args.cuerpo_archivo, encoding="utf-8") as f:
+            formato_cuerpo = f.read().strip()
+        verificar_campana_cli(args, formato_cuerpo, args.clave or os.environ.get("CLAVE_SMTP", ""))
+        return
+    
     app = InterfazGrafica()
     app.run()
 